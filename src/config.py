@@ -1,19 +1,48 @@
 import os
+from functools import cached_property, lru_cache
 from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class SecretSettings(BaseSettings):
+    """Secret-bearing settings, resolved lazily on first access.
+
+    Kept separate from Settings so importing the application (and serving
+    /health) never depends on secrets being available yet.
+    """
+
+    # Claude Code Configuration
+    claude_code_oauth_token: str
+
+    # Slack Configuration
+    slack_webhook_url: str
+    slack_bot_token: Optional[str] = None
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore",
+    )
+
+
+@lru_cache
+def get_secrets() -> SecretSettings:
+    """Return the secret settings, loading them on first call."""
+    return SecretSettings()
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
     # Claude Code Configuration
-    claude_code_oauth_token: str
     anthropic_model: str = "claude-sonnet-4-20250514"
     claude_max_turns: int = 25
     claude_timeout: int = 300
 
     # Prometheus Configuration
     prometheus_url: str = "http://host.docker.internal:9090"
+    prometheus_max_concurrency: int = 16
     kubeconfig_path: str = "~/.kube/config"
 
     # Cluster Configuration
@@ -23,10 +52,9 @@ class Settings(BaseSettings):
 
     # Report Configuration
     report_language: str = "spanish"
+    pdf_renderer: str = "weasyprint"  # "weasyprint" or "chromium" (needs the chromium extra)
 
     # Slack Configuration
-    slack_webhook_url: str
-    slack_bot_token: Optional[str] = None
     slack_channel: Optional[str] = None
 
     # Storage Configuration
@@ -36,6 +64,7 @@ class Settings(BaseSettings):
     # Job Queue Configuration
     job_poll_interval: int = 5  # Seconds between queue polls
     job_max_retries: int = 3  # Maximum retry attempts for failed jobs
+    job_retry_base_delay: int = 30  # Seconds before first retry, doubled per attempt
 
     # Logging Configuration
     log_level: str = "INFO"
@@ -44,12 +73,28 @@ class Settings(BaseSettings):
         env_file=".env",
         env_file_encoding="utf-8",
         case_sensitive=False,
+        extra="ignore",
     )
 
     @property
-    def excluded_namespaces(self) -> list[str]:
-        """Return list of excluded namespaces."""
-        return [ns.strip() for ns in self.namespaces_exclude.split(",")]
+    def claude_code_oauth_token(self) -> str:
+        """Return Claude Code OAuth token (lazily resolved)."""
+        return get_secrets().claude_code_oauth_token
+
+    @property
+    def slack_webhook_url(self) -> str:
+        """Return Slack webhook URL (lazily resolved)."""
+        return get_secrets().slack_webhook_url
+
+    @property
+    def slack_bot_token(self) -> Optional[str]:
+        """Return Slack bot token (lazily resolved)."""
+        return get_secrets().slack_bot_token
+
+    @cached_property
+    def excluded_namespaces(self) -> tuple[str, ...]:
+        """Return excluded namespaces, parsed once per settings instance."""
+        return tuple(ns.strip() for ns in self.namespaces_exclude.split(","))
 
     @property
     def sqlite_path(self) -> str:
@@ -57,5 +102,16 @@ class Settings(BaseSettings):
         return os.path.join(self.data_dir, "watchdog.db")
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Return the application settings, loading them on first call."""
+    return Settings()
+
+
+def __getattr__(name: str) -> Settings:
+    # Importing src.config does not build Settings; library modules call
+    # get_settings() at use sites. `from src.config import settings` still
+    # works and builds it on first access (src.main does this at import).
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
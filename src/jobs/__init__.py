@@ -2,6 +2,6 @@
 
 from .queue import JobQueue, Job
 from .worker import start_worker
-from .processors import process_job
+from .processors import JobContext, process_job
 
-__all__ = ["JobQueue", "Job", "start_worker", "process_job"]
+__all__ = ["JobQueue", "Job", "start_worker", "process_job", "JobContext"]
@@ -1,27 +1,96 @@
 import asyncio
 import structlog
+from dataclasses import dataclass
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import Awaitable, Callable, TypeVar
 
-from src.config import settings
+from opentelemetry import trace
+
+from src.config import get_settings
+from src.jobs.queue import Job
 from src.orchestrator import K8sWatchdogAgent
-from src.reporter import SlackReporter
+from src.reporter import SlackReporter, build_tools_info_message
 from src.storage import ReportStorage
 
-if TYPE_CHECKING:
-    from src.jobs.queue import Job
+logger = structlog.get_logger(source="processor")
+tracer = trace.get_tracer("k8s-watchdog")
+
+T = TypeVar("T")
+
+
+@dataclass
+class JobContext:
+    """Long-lived components shared by job processors across jobs."""
+    agent: K8sWatchdogAgent
+    storage: ReportStorage
+    reporter: SlackReporter
+
+
+Processor = Callable[[Job, JobContext], Awaitable[dict]]
+
+# Job type -> processor, populated by @register
+_PROCESSORS: dict[str, Processor] = {}
+
+
+def register(job_type: str) -> Callable[[Processor], Processor]:
+    """Register a processor for a job type.
+
+    Args:
+        job_type: Job type handled by the decorated processor
+
+    Returns:
+        Decorator that registers and returns the processor unchanged
+
+    Example:
+        @register("generate_report")
+        async def process_report_generation(job, ctx): ...
+    """
+    def decorator(processor: Processor) -> Processor:
+        _PROCESSORS[job_type] = processor
+        return processor
+
+    return decorator
+
 
-logger = structlog.get_logger()
+async def _traced(name: str, aw: Awaitable[T]) -> T:
+    """Await an awaitable inside its own span (usable as a task).
+
+    Args:
+        name: Span name
+        aw: Awaitable to run
+
+    Returns:
+        Result of the awaitable
+    """
+    with tracer.start_as_current_span(name):
+        return await aw
 
 
-def process_job(job: "Job") -> dict:
+def _report_filename(now: datetime) -> str:
+    """Build the PDF filename for a report generated at the given time.
+
+    Args:
+        now: Report generation time
+
+    Returns:
+        Filename like k8s-report-<client>-<cluster>-YYYYMMDD-HHMM.pdf
+    """
+    settings = get_settings()
+    return (
+        f"k8s-report-{settings.client_name}-{settings.cluster_name}-"
+        f"{now.year:04d}{now.month:02d}{now.day:02d}-{now.hour:02d}{now.minute:02d}.pdf"
+    )
+
+
+async def process_job(job: Job, ctx: JobContext) -> dict:
     """Process a job based on its type.
 
-    This is the main dispatcher that routes jobs to their specific processors.
-    Runs synchronously in a thread pool via asyncio.to_thread().
+    This is the main dispatcher that routes jobs to the processor registered
+    for their type (see register()). Runs directly on the worker's event loop.
 
     Args:
         job: Job instance to process
+        ctx: Shared components used by processors
 
     Returns:
         Result dictionary with processing outcome
@@ -31,36 +100,34 @@ def process_job(job: "Job") -> dict:
         Exception: Any exception from the specific processor
 
     Note:
-        This function runs in a ThreadPoolExecutor, not in the main event loop.
-        It's safe to call blocking operations here without affecting /health endpoint.
+        Processors must not block the event loop; CPU-bound steps (PDF
+        rendering) are offloaded to a process pool by the component that owns them.
     """
     logger.info(
         "processing_job",
         job_id=job.id,
         job_type=job.type,
-        source="processor",
     )
 
-    if job.type == "generate_report":
-        return process_report_generation(job)
-    else:
+    processor = _PROCESSORS.get(job.type)
+    if processor is None:
         raise ValueError(f"Unknown job type: {job.type}")
 
+    return await processor(job, ctx)
 
-def process_report_generation(job: "Job") -> dict:
-    """Process a report generation job.
 
-    This function contains all the logic previously in generate_and_send_report(),
-    but runs synchronously in a thread pool. This prevents blocking the event loop.
+@register("generate_report")
+async def process_report_generation(job: Job, ctx: JobContext) -> dict:
+    """Process a report generation job.
 
     The function:
     1. Generates the report using Claude AI
-    2. Saves it to storage
-    3. Sends it to Slack
-    4. Returns processing metadata
+    2. Saves it to storage and sends it to Slack concurrently
+    3. Returns processing metadata
 
     Args:
         job: Job instance with report generation request
+        ctx: Shared agent, storage and reporter instances
 
     Returns:
         Dict with report metadata (status, report_id, generation_time, etc.)
@@ -69,82 +136,69 @@ def process_report_generation(job: "Job") -> dict:
         Exception: Any error during report generation, storage, or sending
 
     Note:
-        - Runs in ThreadPoolExecutor (separate thread)
-        - Uses asyncio.run() to execute async operations in the thread's own event loop
-        - Event loop in main thread remains free for /health requests
-        - I/O operations (Claude API, kubectl, Slack) release GIL automatically
+        - Runs on the worker's event loop
+        - Claude Code runs as a subprocess and Slack/SQLite calls are async,
+          so the event loop remains free for /health requests
+        - PDF rendering runs in SlackReporter's spawned process pool
+        - Each stage is wrapped in an OpenTelemetry span under report_pipeline
     """
-    logger.info(
-        "generating_report_in_worker",
-        job_id=job.id,
-        cluster=settings.cluster_name,
-        source="processor",
-    )
-
-    start_time = datetime.now()
+    with tracer.start_as_current_span("report_pipeline", attributes={"job.id": job.id}):
+        logger.info(
+            "generating_report_in_worker",
+            job_id=job.id,
+            cluster=get_settings().cluster_name,
+        )
 
-    try:
-        # Create a new event loop for this thread
-        # This is necessary because async operations need an event loop,
-        # but we're in a thread pool thread without one
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        start_time = datetime.now()
 
         try:
-            # Initialize components (these need to be created in the thread)
-            agent = K8sWatchdogAgent()
-            storage = ReportStorage()
-
             # Generate report using Claude AI
             # This is the longest operation (~60-70 seconds)
-            report_html, metadata = loop.run_until_complete(
-                agent.generate_weekly_report()
-            )
+            with tracer.start_as_current_span("generate_weekly_report") as span:
+                report_html, metadata = await ctx.agent.generate_weekly_report()
 
-            generation_time = (datetime.now() - start_time).total_seconds()
+                generation_time = (datetime.now() - start_time).total_seconds()
+                span.set_attribute("generation_time_seconds", generation_time)
 
             logger.info(
                 "report_generated_in_worker",
                 job_id=job.id,
                 generation_time_seconds=generation_time,
                 report_size_kb=len(report_html) / 1024,
-                source="processor",
-            )
-
-            # Save to storage
-            report_id = loop.run_until_complete(
-                storage.save_report(report_html)
-            )
-
-            logger.info(
-                "report_saved_in_worker",
-                job_id=job.id,
-                report_id=report_id,
-                source="processor",
             )
 
             # Build informative message about data sources
-            tools_message = _build_tools_info_message(metadata, generation_time)
-
-            # Send to Slack
-            reporter = SlackReporter()
-            loop.run_until_complete(
-                reporter.send_html_report(
-                    html_content=report_html,
-                    filename=f"k8s-report-{settings.client_name}-{settings.cluster_name}-{datetime.now().strftime('%Y%m%d-%H%M')}.pdf",
-                    message=tools_message,
-                )
-            )
+            tools_message = build_tools_info_message(metadata, generation_time)
+
+            # Save to storage and send to Slack concurrently (independent backends).
+            # A TaskGroup cancels the other stage if one fails, so a retried job
+            # does not leave an orphaned upload that still posts to Slack.
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    save_task = tg.create_task(
+                        _traced("save_report", ctx.storage.save_report(report_html))
+                    )
+                    tg.create_task(
+                        _traced(
+                            "send_html_report",
+                            ctx.reporter.send_html_report(
+                                html_content=report_html,
+                                filename=_report_filename(datetime.now()),
+                                message=tools_message,
+                            ),
+                        )
+                    )
+            except ExceptionGroup as eg:
+                # Report the failing stage's own error rather than the group
+                raise eg.exceptions[0] from eg
+            report_id = save_task.result()
 
             logger.info(
-                "report_sent_in_worker",
+                "report_saved_and_sent_in_worker",
                 job_id=job.id,
-                source="processor",
+                report_id=report_id,
             )
 
-            # Cleanup agent resources
-            loop.run_until_complete(agent.cleanup())
-
             return {
                 "status": "success",
                 "report_id": report_id,
@@ -152,57 +206,13 @@ def process_report_generation(job: "Job") -> dict:
                 "report_size_kb": len(report_html) / 1024,
             }
 
-        finally:
-            # Clean up the event loop
-            loop.close()
-
-    except Exception as e:
-        logger.error(
-            "report_generation_failed_in_worker",
-            job_id=job.id,
-            error=str(e),
-            error_type=type(e).__name__,
-            source="processor",
-            exc_info=True,
-        )
-        raise
-
-
-def _build_tools_info_message(metadata: dict, generation_time: float) -> str:
-    """Build informative message about tools used in report generation.
-
-    Args:
-        metadata: Report generation metadata
-        generation_time: Time taken to generate report (seconds)
-
-    Returns:
-        Formatted message string for Slack
-    """
-    message_parts = [
-        "🤖 *Weekly Cluster Health Report*",
-        f"⏱️ Generation time: {generation_time:.1f}s",
-        f"🔧 Cluster: `{settings.cluster_name}`",
-    ]
-
-    if metadata.get("model"):
-        message_parts.append(f"🧠 Model: `{metadata['model']}`")
-
-    if metadata.get("mcp_servers_used"):
-        servers = ", ".join(f"`{s}`" for s in metadata["mcp_servers_used"])
-        message_parts.append(f"📡 MCP Servers: {servers}")
-
-    if metadata.get("num_turns"):
-        message_parts.append(f"🔄 Agent turns: {metadata['num_turns']}")
-
-    if metadata.get("total_cost_usd"):
-        message_parts.append(f"💰 Cost: ${metadata['total_cost_usd']:.4f}")
-
-    # Legacy fields support
-    if metadata.get("tools_used"):
-        tools = ", ".join(f"`{t}`" for t in metadata["tools_used"][:5])
-        message_parts.append(f"🛠️ Tools used: {tools}")
-
-    if metadata.get("total_tool_calls"):
-        message_parts.append(f"📝 Total tool calls: {metadata['total_tool_calls']}")
+        except Exception as e:
+            logger.error(
+                "report_generation_failed_in_worker",
+                job_id=job.id,
+                error=str(e),
+                error_type=type(e).__name__,
+                exc_info=True,
+            )
+            raise
 
-    return "\n".join(message_parts)
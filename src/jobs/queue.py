@@ -1,11 +1,16 @@
-import json
+import asyncio
+import orjson
 import structlog
+from collections import deque
 from dataclasses import dataclass
 from typing import Optional
 
 from src.storage import ReportStorage
 
-logger = structlog.get_logger()
+logger = structlog.get_logger(source="queue")
+
+# Maximum number of pending jobs claimed per database round trip
+CLAIM_BATCH_SIZE = 8
 
 
 @dataclass
@@ -34,7 +39,9 @@ class JobQueue:
             storage: ReportStorage instance for database operations
         """
         self.storage = storage
-        logger.info("job_queue_initialized", source="queue")
+        self._wakeup = asyncio.Event()
+        self._claimed: deque[Job] = deque()
+        logger.info("job_queue_initialized")
 
     async def enqueue(self, job_type: str, payload: Optional[dict] = None) -> int:
         """Add a new job to the queue.
@@ -49,23 +56,67 @@ class JobQueue:
         Example:
             job_id = await queue.enqueue('generate_report', {'urgent': True})
         """
-        payload_str = json.dumps(payload) if payload else None
+        payload_str = orjson.dumps(payload).decode() if payload else None
         job_id = await self.storage.insert_job(job_type, payload_str)
+        self._wakeup.set()
 
         logger.info(
             "job_enqueued",
             job_id=job_id,
             job_type=job_type,
-            source="queue",
         )
 
         return job_id
 
+    async def enqueue_unique(
+        self, job_type: str, payload: Optional[dict] = None
+    ) -> tuple[int, bool]:
+        """Add a job unless one of the same type is already pending or processing.
+
+        Args:
+            job_type: Type of job to process (e.g., 'generate_report')
+            payload: Optional dictionary with job-specific data
+
+        Returns:
+            Tuple of (job ID, whether a new job was enqueued)
+
+        Example:
+            job_id, created = await queue.enqueue_unique('generate_report')
+        """
+        payload_str = orjson.dumps(payload).decode() if payload else None
+        job_id, created = await self.storage.insert_job_if_idle(job_type, payload_str)
+
+        if created:
+            self._wakeup.set()
+
+        logger.info(
+            "job_enqueued" if created else "job_already_active",
+            job_id=job_id,
+            job_type=job_type,
+        )
+
+        return job_id, created
+
+    async def wait_for_job(self, timeout: float) -> None:
+        """Wait until a job is enqueued or the timeout expires.
+
+        Args:
+            timeout: Maximum seconds to wait before returning (fallback poll)
+
+        Note:
+            For Redis migration: Replace with a blocking pop timeout
+        """
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
     async def get_next_job(self) -> Optional[Job]:
-        """Get the next pending job from the queue.
+        """Claim the next pending job from the queue, without batching.
 
         Returns:
-            Job instance or None if no jobs are pending
+            Job instance (already marked as processing) or None if no jobs are pending
 
         Note:
             For Redis migration: Replace with redis.brpop() or similar
@@ -75,19 +126,85 @@ class JobQueue:
         if not job_data:
             return None
 
-        # Parse payload if exists
+        job = self._build_job(job_data)
+
+        logger.info(
+            "job_claimed",
+            job_id=job.id,
+            job_type=job.type,
+        )
+
+        return job
+
+    async def claim_next_job(self) -> Optional[Job]:
+        """Atomically claim the next pending job and mark it as processing.
+
+        Pending jobs are claimed in small batches with a single
+        UPDATE ... RETURNING statement and buffered in memory, so bursts
+        of enqueued jobs cost one database round trip.
+
+        Returns:
+            Job instance (already marked as processing) or None if no jobs are pending
+
+        Note:
+            For Redis migration: Replace with redis.blmove() or similar
+        """
+        if not self._claimed:
+            rows = await self.storage.claim_pending_jobs(CLAIM_BATCH_SIZE)
+            self._claimed.extend(self._build_job(row) for row in rows)
+
+        if not self._claimed:
+            return None
+
+        job = self._claimed.popleft()
+
+        logger.info(
+            "job_claimed",
+            job_id=job.id,
+            job_type=job.type,
+            buffered=len(self._claimed),
+        )
+
+        return job
+
+    async def release_claimed(self) -> None:
+        """Return buffered claimed jobs to the pending state.
+
+        Called on worker shutdown so jobs claimed but not yet started are
+        not left stuck in the processing state.
+        """
+        if not self._claimed:
+            return
+
+        job_ids = [job.id for job in self._claimed]
+        self._claimed.clear()
+        await self.storage.release_jobs(job_ids)
+
+        logger.info(
+            "claimed_jobs_released",
+            job_ids=job_ids,
+        )
+
+    def _build_job(self, job_data: dict) -> Job:
+        """Build a Job from a database row, parsing its payload.
+
+        Args:
+            job_data: Job row as returned by storage
+
+        Returns:
+            Job instance
+        """
         payload = None
         if job_data.get("payload"):
             try:
-                payload = json.loads(job_data["payload"])
-            except json.JSONDecodeError:
+                payload = orjson.loads(job_data["payload"])
+            except orjson.JSONDecodeError:
                 logger.warning(
                     "invalid_job_payload",
                     job_id=job_data["id"],
-                    source="queue",
                 )
 
-        job = Job(
+        return Job(
             id=job_data["id"],
             type=job_data["type"],
             status=job_data["status"],
@@ -96,18 +213,12 @@ class JobQueue:
             retry_count=job_data.get("retry_count", 0),
         )
 
-        logger.debug(
-            "job_retrieved",
-            job_id=job.id,
-            job_type=job.type,
-            source="queue",
-        )
-
-        return job
-
     async def mark_processing(self, job_id: int) -> None:
         """Mark a job as currently being processed.
 
+        Deprecated: claim_next_job() and get_next_job() already mark claimed
+        jobs as processing.
+
         Args:
             job_id: ID of the job to mark as processing
         """
@@ -116,7 +227,6 @@ class JobQueue:
         logger.info(
             "job_marked_processing",
             job_id=job_id,
-            source="queue",
         )
 
     async def mark_completed(self, job_id: int, result: dict) -> None:
@@ -126,7 +236,7 @@ class JobQueue:
             job_id: ID of the completed job
             result: Result data from job processing
         """
-        result_str = json.dumps(result)
+        result_str = orjson.dumps(result).decode()
         await self.storage.update_job_status(
             job_id, "completed", result=result_str
         )
@@ -134,11 +244,10 @@ class JobQueue:
         logger.info(
             "job_completed",
             job_id=job_id,
-            source="queue",
         )
 
     async def mark_failed(
-        self, job_id: int, error: str, retry: bool = False
+        self, job_id: int, error: str, retry: bool = False, delay: float = 0.0
     ) -> None:
         """Mark a job as failed.
 
@@ -146,15 +255,16 @@ class JobQueue:
             job_id: ID of the failed job
             error: Error message describing the failure
             retry: Whether to retry the job (increments retry_count)
+            delay: Seconds before a retried job becomes claimable again
         """
         if retry:
-            retry_count = await self.storage.increment_job_retry(job_id)
+            retry_count = await self.storage.increment_job_retry(job_id, delay)
             logger.warning(
                 "job_failed_will_retry",
                 job_id=job_id,
                 error=error,
                 retry_count=retry_count,
-                source="queue",
+                retry_delay_seconds=delay,
             )
         else:
             await self.storage.update_job_status(
@@ -164,5 +274,4 @@ class JobQueue:
                 "job_failed",
                 job_id=job_id,
                 error=error,
-                source="queue",
             )
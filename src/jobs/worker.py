@@ -1,63 +1,98 @@
 import asyncio
+import random
 import structlog
 
-from src.config import settings
+from src.config import get_settings
 from src.jobs.queue import JobQueue
-from src.jobs.processors import process_job
+from src.jobs.processors import JobContext, process_job
+from src.orchestrator import K8sWatchdogAgent
+from src.reporter import SlackReporter
+from src.storage import ReportStorage
 
-logger = structlog.get_logger()
+logger = structlog.get_logger(source="worker")
 
+# Upper bounds (seconds) for exponential backoff
+LOOP_ERROR_MAX_DELAY = 60
+JOB_RETRY_MAX_DELAY = 900
 
-async def start_worker(queue: JobQueue) -> asyncio.Task:
+
+def _backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Return an exponential backoff delay with up to one second of jitter.
+
+    Args:
+        attempt: Zero-based attempt number
+        base: Delay for the first attempt (seconds)
+        cap: Maximum delay before jitter (seconds)
+
+    Returns:
+        Delay in seconds
+    """
+    return min(base * 2 ** attempt, cap) + random.random()
+
+
+async def start_worker(
+    queue: JobQueue,
+    *,
+    agent: K8sWatchdogAgent,
+    storage: ReportStorage,
+    reporter: SlackReporter,
+) -> asyncio.Task:
     """Start the worker task for processing jobs.
 
-    This creates a background asyncio task that continuously polls the
-    job queue and processes jobs in a thread pool, keeping the main
-    event loop responsive.
+    This creates a background asyncio task that waits on the job queue
+    and processes jobs without blocking the main event loop.
 
     Args:
         queue: JobQueue instance to pull jobs from
+        agent: Long-lived agent used to generate reports
+        storage: Long-lived storage used to persist reports
+        reporter: Long-lived Slack reporter used to deliver reports
 
     Returns:
         asyncio.Task that can be cancelled during shutdown
 
     Example:
-        worker_task = await start_worker(queue)
+        worker_task = await start_worker(
+            queue, agent=agent, storage=storage, reporter=reporter
+        )
         # ... application runs ...
         worker_task.cancel()  # Stop worker during shutdown
     """
-    task = asyncio.create_task(_worker_loop(queue))
-    logger.info("worker_started", source="worker")
+    ctx = JobContext(agent=agent, storage=storage, reporter=reporter)
+    task = asyncio.create_task(_worker_loop(queue, ctx))
+    logger.info("worker_started")
     return task
 
 
-async def _worker_loop(queue: JobQueue) -> None:
+async def _worker_loop(queue: JobQueue, ctx: JobContext) -> None:
     """Internal worker loop that processes jobs.
 
     This loop:
-    1. Polls the queue for pending jobs every poll_interval seconds
-    2. If a job is found, processes it in a thread pool (via asyncio.to_thread)
-    3. The thread pool execution keeps the event loop free for HTTP requests
+    1. Waits for enqueued jobs, polling every poll_interval seconds as a fallback
+    2. If a job is found, awaits its processor on the event loop
+    3. Processors only await async I/O, keeping the event loop free for HTTP requests
     4. Handles job completion, failures, and retries
 
     Args:
         queue: JobQueue instance to pull jobs from
+        ctx: Shared components passed to every job processor
 
     Note:
         This runs indefinitely until the task is cancelled.
-        Uses asyncio.to_thread() to prevent blocking the event loop.
     """
+    settings = get_settings()
     logger.info(
         "worker_loop_started",
         poll_interval=settings.job_poll_interval,
         max_retries=settings.job_max_retries,
-        source="worker",
     )
 
+    consecutive_errors = 0
+
     while True:
         try:
-            # Check for next job in queue
-            job = await queue.get_next_job()
+            # Claim next job in queue (atomically marked as processing)
+            job = await queue.claim_next_job()
 
             if job:
                 logger.info(
@@ -65,19 +100,13 @@ async def _worker_loop(queue: JobQueue) -> None:
                     job_id=job.id,
                     job_type=job.type,
                     retry_count=job.retry_count,
-                    source="worker",
                 )
 
-                # Mark job as processing
-                await queue.mark_processing(job.id)
-
                 try:
-                    # Execute job in thread pool to avoid blocking event loop
-                    # This is the KEY part that solves the health check issue:
-                    # - process_job runs in a separate thread
-                    # - Event loop remains free to handle /health requests
-                    # - Python GIL is released during I/O operations (Claude API, kubectl, etc.)
-                    result = await asyncio.to_thread(process_job, job)
+                    # Execute job directly on the event loop. Its I/O is async
+                    # (Claude subprocess, SQLite, Slack) and PDF rendering runs
+                    # in a separate process, so /health stays responsive.
+                    result = await process_job(job, ctx)
 
                     # Mark job as completed
                     await queue.mark_completed(job.id, result)
@@ -86,7 +115,6 @@ async def _worker_loop(queue: JobQueue) -> None:
                         "worker_job_completed",
                         job_id=job.id,
                         job_type=job.type,
-                        source="worker",
                     )
 
                 except Exception as job_error:
@@ -104,22 +132,29 @@ async def _worker_loop(queue: JobQueue) -> None:
                         error=error_msg,
                         retry_count=job.retry_count,
                         will_retry=should_retry,
-                        source="worker",
                         exc_info=True,
                     )
 
-                    # Mark as failed (with retry if applicable)
+                    # Mark as failed (with a backed-off retry if applicable)
+                    retry_delay = _backoff_delay(
+                        job.retry_count,
+                        settings.job_retry_base_delay,
+                        JOB_RETRY_MAX_DELAY,
+                    )
                     await queue.mark_failed(
-                        job.id, error_msg, retry=should_retry
+                        job.id, error_msg, retry=should_retry, delay=retry_delay
                     )
 
             else:
-                # No jobs in queue, wait before polling again
-                await asyncio.sleep(settings.job_poll_interval)
+                # No jobs in queue, wait for an enqueue (or poll interval as fallback)
+                await queue.wait_for_job(settings.job_poll_interval)
+
+            consecutive_errors = 0
 
         except asyncio.CancelledError:
             # Worker is being shut down
-            logger.info("worker_shutting_down", source="worker")
+            logger.info("worker_shutting_down")
+            await queue.release_claimed()
             raise
 
         except Exception as loop_error:
@@ -129,9 +164,11 @@ async def _worker_loop(queue: JobQueue) -> None:
                 "worker_loop_error",
                 error=str(loop_error),
                 error_type=type(loop_error).__name__,
-                source="worker",
                 exc_info=True,
             )
 
-            # Wait a bit before continuing to avoid tight error loops
-            await asyncio.sleep(5)
+            # Back off exponentially to avoid tight error loops (e.g. SQLite locked)
+            await asyncio.sleep(
+                _backoff_delay(consecutive_errors, 1.0, LOOP_ERROR_MAX_DELAY)
+            )
+            consecutive_errors += 1
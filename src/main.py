@@ -1,13 +1,17 @@
 from contextlib import asynccontextmanager
 from typing import Optional
 import asyncio
+import sys
 
+import orjson
 import structlog
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel
 
 from src import __version__
 from src.config import settings
+from src.orchestrator import K8sWatchdogAgent
+from src.reporter import SlackReporter
 from src.storage import ReportStorage
 from src.jobs import JobQueue, start_worker
 
@@ -26,11 +30,6 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
-# Global instances
-storage: Optional[ReportStorage] = None
-job_queue: Optional[JobQueue] = None
-worker_task = None
-
 
 class ReportResponse(BaseModel):
     """Response model for report generation."""
@@ -40,6 +39,21 @@ class ReportResponse(BaseModel):
     generation_time_seconds: Optional[float] = None
 
 
+class ReportStatistics(BaseModel):
+    """Aggregate statistics about stored reports."""
+    total_reports: int
+    total_size_bytes: int
+    latest_report_date: Optional[str] = None
+    oldest_report_date: Optional[str] = None
+
+
+class ReportListResponse(BaseModel):
+    """Response model for the report listing."""
+    cluster: str
+    statistics: ReportStatistics
+    message: str
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
     status: str
@@ -49,14 +63,18 @@ class HealthResponse(BaseModel):
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Manage application lifecycle."""
-    global storage, job_queue, worker_task
+    """Manage application lifecycle.
 
+    Long-lived components are published on app.state for the request
+    dependencies below.
+    """
     logger.info(
         "k8s_watchdog_ai_starting",
         version=__version__,
         cluster=settings.cluster_name,
         language=settings.report_language,
+        # False only on free-threaded builds (Python 3.13t+)
+        gil_enabled=getattr(sys, "_is_gil_enabled", lambda: True)(),
     )
 
     # Initialize storage
@@ -68,23 +86,42 @@ async def lifespan(app: FastAPI):
     deleted = await storage.cleanup_old_reports()
     logger.info("old_reports_cleaned", count=deleted)
 
+    # Requeue jobs interrupted by a previous shutdown or crash
+    requeued = await storage.requeue_processing_jobs()
+    logger.info("interrupted_jobs_requeued", count=requeued)
+
     # Initialize job queue
     job_queue = JobQueue(storage)
     logger.info("job_queue_initialized")
 
+    # Initialize long-lived components shared by all jobs
+    agent = K8sWatchdogAgent()
+    reporter = SlackReporter()
+
     # Start worker task
-    worker_task = await start_worker(job_queue)
+    worker_task = await start_worker(
+        job_queue, agent=agent, storage=storage, reporter=reporter
+    )
     logger.info("worker_task_started")
 
+    app.state.storage = storage
+    app.state.job_queue = job_queue
+
     yield
 
     # Shutdown: stop worker gracefully
-    if worker_task:
-        worker_task.cancel()
-        try:
-            await worker_task
-        except asyncio.CancelledError:
-            pass
+    worker_task.cancel()
+    try:
+        await worker_task
+    except asyncio.CancelledError:
+        pass
+
+    # Cleanup agent resources
+    await agent.cleanup()
+    await reporter.close()
+
+    # Close database connections
+    await storage.close()
 
     logger.info("k8s_watchdog_ai_shutdown")
 
@@ -98,36 +135,81 @@ app = FastAPI(
 )
 
 
+def get_storage(request: Request) -> ReportStorage:
+    """Resolve the report storage initialized by the lifespan."""
+    storage = getattr(request.app.state, "storage", None)
+    if storage is None:
+        raise HTTPException(status_code=503, detail="Storage not initialized")
+    return storage
+
+
+def get_job_queue(request: Request) -> JobQueue:
+    """Resolve the job queue initialized by the lifespan."""
+    job_queue = getattr(request.app.state, "job_queue", None)
+    if job_queue is None:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+    return job_queue
+
+
+# Pre-encoded bodies for static endpoints (probed frequently, never change)
+_HEALTH_BODY = orjson.dumps(
+    HealthResponse(
+        status="healthy",
+        version=__version__,
+        cluster=settings.cluster_name,
+    ).model_dump()
+)
+_ROOT_BODY = orjson.dumps({
+    "service": "K8s Watchdog AI",
+    "version": __version__,
+    "cluster": settings.cluster_name,
+    "endpoints": {
+        "health": "/health",
+        "trigger_report": "POST /report",
+        "list_reports": "/reports",
+        "docs": "/docs",
+    }
+})
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint.
 
     This endpoint remains responsive even during report generation because
-    the worker processes jobs in a thread pool, keeping the event loop free.
+    the worker only awaits async I/O and renders PDFs in a separate process,
+    keeping the event loop free. The body is pre-encoded, so no model is built or
+    validated per probe.
     """
-    return HealthResponse(
-        status="healthy",
-        version=__version__,
-        cluster=settings.cluster_name,
-    )
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 @app.post("/report", response_model=ReportResponse, status_code=202)
-async def trigger_report():
+async def trigger_report(job_queue: JobQueue = Depends(get_job_queue)):
     """Trigger report generation by enqueuing a job.
 
     This endpoint adds a report generation job to the queue and returns immediately.
     The worker task processes the job asynchronously, keeping the event loop free
-    for handling health checks and other requests.
+    for handling health checks and other requests. If a report job is already
+    pending or processing, no new job is enqueued and the active job is reported.
     """
-    if not job_queue:
-        raise HTTPException(
-            status_code=503,
-            detail="Job queue not initialized"
+    # Enqueue job unless one is already active (returns immediately)
+    job_id, created = await job_queue.enqueue_unique(
+        "generate_report", payload={"trigger": "manual"}
+    )
+
+    if not created:
+        logger.info(
+            "report_job_already_active",
+            job_id=job_id,
+            cluster=settings.cluster_name,
         )
 
-    # Enqueue job (returns immediately)
-    job_id = await job_queue.enqueue("generate_report")
+        return ReportResponse(
+            status="accepted",
+            message=f"Report generation already in progress (job_id={job_id}).",
+            report_id=job_id,
+        )
 
     logger.info(
         "report_job_enqueued",
@@ -138,38 +220,26 @@ async def trigger_report():
     return ReportResponse(
         status="accepted",
         message=f"Report generation job enqueued (job_id={job_id}). Worker will process it.",
+        report_id=job_id,
     )
 
 
-@app.get("/reports")
-async def list_reports(limit: int = 10):
+@app.get("/reports", response_model=ReportListResponse)
+async def list_reports(limit: int = 10, storage: ReportStorage = Depends(get_storage)):
     """List recent reports."""
-    if not storage:
-        raise HTTPException(status_code=503, detail="Storage not initialized")
-
     stats = await storage.get_report_stats()
 
-    return {
-        "cluster": settings.cluster_name,
-        "statistics": stats,
-        "message": "Use report ID to retrieve specific reports from storage",
-    }
+    return ReportListResponse(
+        cluster=settings.cluster_name,
+        statistics=ReportStatistics(**stats),
+        message="Use report ID to retrieve specific reports from storage",
+    )
 
 
 @app.get("/")
 async def root():
     """Root endpoint."""
-    return {
-        "service": "K8s Watchdog AI",
-        "version": __version__,
-        "cluster": settings.cluster_name,
-        "endpoints": {
-            "health": "/health",
-            "trigger_report": "POST /report",
-            "list_reports": "/reports",
-            "docs": "/docs",
-        }
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
@@ -181,4 +251,6 @@ if __name__ == "__main__":
         port=8000,
         reload=True,
         log_level=settings.log_level.lower(),
+        loop="uvloop",
+        http="httptools",
     )
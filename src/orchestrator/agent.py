@@ -1,15 +1,56 @@
 import asyncio
-import json
+import logging
 import os
+import re
 import sys
 import tempfile
+import uuid
+from typing import Optional
 
+import orjson
 import structlog
+from opentelemetry import trace
 
-from src.config import settings
+from src.config import get_settings
 from src.orchestrator.prompts import get_system_prompt
 
 logger = structlog.get_logger()
+tracer = trace.get_tracer("k8s-watchdog")
+
+# Max size of a single stream-json line; the final result event embeds the full HTML report
+STREAM_LINE_LIMIT = 16 * 1024 * 1024
+
+# Bytes of stderr kept for diagnostics; anything earlier is discarded while draining
+STDERR_TAIL_LIMIT = 4096
+
+# Start of the HTML document, used to drop any text the model put before it
+_HTML_START = re.compile(r"<!DOCTYPE|<html", re.IGNORECASE)
+
+# User prompt sent on every run; only the placeholders change between calls
+_USER_PROMPT_TEMPLATE = """Generate a weekly health report for cluster {cluster}.
+
+Investigate the current cluster state using the available tools:
+1. Check pod and node status
+2. Identify problems (restarts, errors, OOMKilled)
+3. Analyze Prometheus metrics for resource issues
+4. Compare actual usage vs requests/limits
+5. Generate prioritized recommendations
+
+Excluded namespaces: {excluded_namespaces}
+
+CRITICAL - RESPONSE FORMAT:
+- Save the complete HTML report with the Write tool to: {report_path}
+- The file must contain ONLY the HTML code of the report
+- DO NOT include any explanatory text, comments, or messages before or after the HTML in the file
+- The file must start directly with <!DOCTYPE html> or <html>
+- After writing the file, reply with a short confirmation only
+- If any tool is unavailable, simply omit that section from the report without mentioning it in the HTML
+"""
+
+# Stable location for the MCP config, written once per process (tmpfs when available)
+CONFIG_DIR = os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "k8s-watchdog"
+)
 
 
 class K8sWatchdogAgent:
@@ -21,6 +62,15 @@ class K8sWatchdogAgent:
 
     def __init__(self) -> None:
         """Initialize the watchdog agent."""
+        settings = get_settings()
+        self._system_prompt = get_system_prompt(
+            language=settings.report_language,
+            cluster_name=settings.cluster_name,
+        )
+        self._excluded_namespaces = ", ".join(settings.excluded_namespaces)
+        self._mcp_config = self._build_mcp_config()
+        self._mcp_config_path = os.path.join(CONFIG_DIR, "mcp_config.json")
+        self._mcp_config_written = False
         logger.info(
             "watchdog_agent_initialized",
             model=settings.anthropic_model,
@@ -52,12 +102,115 @@ class K8sWatchdogAgent:
                     "command": sys.executable,
                     "args": [mcp_prom_path],
                     "env": {
-                        "PROMETHEUS_URL": settings.prometheus_url,
+                        "PROMETHEUS_URL": get_settings().prometheus_url,
+                        "PROMETHEUS_MAX_CONCURRENCY": str(get_settings().prometheus_max_concurrency),
                     },
                 },
             }
         }
 
+    def _ensure_mcp_config_file(self) -> None:
+        """Write the MCP config file once per agent.
+
+        The config is constant for the lifetime of the process, so it is written
+        on first use and reused by every later invocation.
+        """
+        if self._mcp_config_written:
+            return
+
+        os.makedirs(CONFIG_DIR, mode=0o700, exist_ok=True)
+
+        with open(self._mcp_config_path, "wb") as mcp_file:
+            mcp_file.write(orjson.dumps(self._mcp_config))
+
+        self._mcp_config_written = True
+        logger.debug("mcp_config_written", path=self._mcp_config_path)
+
+    @staticmethod
+    async def _read_tail(stream: asyncio.StreamReader, limit: int = STDERR_TAIL_LIMIT) -> bytes:
+        """Drain a stream to EOF, keeping only its last ``limit`` bytes.
+
+        Args:
+            stream: Stream to drain
+            limit: Maximum number of trailing bytes to keep
+
+        Returns:
+            The tail of the stream
+        """
+        tail = bytearray()
+        while chunk := await stream.read(65536):
+            tail += chunk
+            if len(tail) > limit:
+                del tail[:-limit]
+        return bytes(tail)
+
+    @staticmethod
+    async def _kill(process: asyncio.subprocess.Process) -> None:
+        """Kill the claude process and reap it.
+
+        Stdout is drained to EOF first: a paused pipe never closes, and the
+        process cannot be awaited until it does.
+        """
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        while await process.stdout.read(65536):
+            pass
+        await process.wait()
+
+    async def _consume_stream(
+        self,
+        process: asyncio.subprocess.Process,
+        tools_used: dict[str, None],
+    ) -> Optional[dict]:
+        """Consume Claude Code stream-json events as they are emitted.
+
+        Only the final result event is kept, so memory stays bounded by a
+        single event instead of the whole transcript. Tool names seen in
+        assistant events are recorded as they stream past.
+
+        Args:
+            process: Running claude process with piped stdout
+            tools_used: Ordered set (dict keys) filled with tool names in
+                first-use order
+
+        Returns:
+            The final result event, or None if none was emitted
+        """
+        result_event = None
+        log_events = logger.is_enabled_for(logging.DEBUG)
+
+        async for line in process.stdout:
+            if not line.strip():
+                continue
+
+            try:
+                event = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                logger.warning(
+                    "claude_code_invalid_event",
+                    error=str(e),
+                    line_preview=line[:200].decode("utf-8", errors="replace"),
+                )
+                continue
+
+            event_type = event.get("type")
+            if event_type == "result":
+                result_event = event
+                continue
+
+            if event_type == "assistant":
+                for block in event.get("message", {}).get("content", ()):
+                    if block.get("type") == "tool_use":
+                        tools_used[block.get("name", "unknown")] = None
+
+            if log_events:
+                logger.debug("claude_code_event", event_type=event_type)
+
+        await process.wait()
+        return result_event
+
     async def cleanup(self) -> None:
         """Cleanup resources."""
         logger.info("tools_cleaned_up")
@@ -66,170 +219,158 @@ class K8sWatchdogAgent:
         """Generate a weekly cluster health report using Claude Code headless mode.
 
         The agent will:
-        1. Write system prompt and MCP config to temp files
+        1. Ensure the MCP config file exists
         2. Invoke claude -p with MCP servers for K8s and Prometheus
-        3. Parse JSON output to extract HTML report
-        4. Return report and metadata
+        3. Have Claude write the HTML report to a file with its Write tool
+        4. Consume stream-json events, keeping the final result for metadata
+        5. Return report and metadata
 
         Returns:
             Tuple of (HTML report as string, metadata dict)
         """
+        settings = get_settings()
         logger.info("starting_weekly_report_generation", cluster=settings.cluster_name)
 
-        # Build system prompt
-        system_prompt = get_system_prompt(
-            language=settings.report_language,
-            cluster_name=settings.cluster_name,
-        )
-
-        # Build user prompt
-        user_prompt = f"""Generate a weekly health report for cluster {settings.cluster_name}.
+        self._ensure_mcp_config_file()
+        report_path = os.path.join(CONFIG_DIR, f"report_{uuid.uuid4().hex}.html")
+
+        user_prompt = _USER_PROMPT_TEMPLATE.format_map({
+            "cluster": settings.cluster_name,
+            "excluded_namespaces": self._excluded_namespaces,
+            "report_path": report_path,
+        })
+
+        # Build claude command
+        cmd = [
+            "claude",
+            "-p", user_prompt,
+            "--output-format", "stream-json",
+            "--verbose",
+            "--model", settings.anthropic_model,
+            "--max-turns", str(settings.claude_max_turns),
+            "--mcp-config", self._mcp_config_path,
+            "--append-system-prompt", self._system_prompt,
+            "--dangerously-skip-permissions",
+            "--no-session-persistence",
+        ]
+
+        # Set environment with OAuth token
+        env = os.environ.copy()
+        env["CLAUDE_CODE_OAUTH_TOKEN"] = settings.claude_code_oauth_token
 
-Investigate the current cluster state using the available tools:
-1. Check pod and node status
-2. Identify problems (restarts, errors, OOMKilled)
-3. Analyze Prometheus metrics for resource issues
-4. Compare actual usage vs requests/limits
-5. Generate prioritized recommendations
-
-Excluded namespaces: {', '.join(settings.excluded_namespaces)}
-
-CRITICAL - RESPONSE FORMAT:
-- Return ONLY the HTML code of the report
-- DO NOT include any explanatory text, comments, or messages before or after the HTML
-- DO NOT write phrases like "I see that...", "I'll proceed...", "Here is..."
-- Your response must start directly with <!DOCTYPE html> or <html>
-- If any tool is unavailable, simply omit that section from the report without mentioning it in the HTML
-"""
-
-        # Write temp files for MCP config and system prompt
-        mcp_config = self._build_mcp_config()
-
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".json", delete=False, prefix="mcp_config_"
-        ) as mcp_file:
-            json.dump(mcp_config, mcp_file)
-            mcp_config_path = mcp_file.name
+        logger.info(
+            "calling_claude_code_headless",
+            model=settings.anthropic_model,
+            max_turns=settings.claude_max_turns,
+            timeout=settings.claude_timeout,
+        )
 
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".txt", delete=False, prefix="system_prompt_"
-        ) as prompt_file:
-            prompt_file.write(system_prompt)
-            prompt_path = prompt_file.name
+        tools_used: dict[str, None] = {}
 
         try:
-            # Build claude command
-            cmd = [
-                "claude",
-                "-p", user_prompt,
-                "--output-format", "json",
-                "--model", settings.anthropic_model,
-                "--max-turns", str(settings.claude_max_turns),
-                "--mcp-config", mcp_config_path,
-                "--append-system-prompt-file", prompt_path,
-                "--dangerously-skip-permissions",
-                "--no-session-persistence",
-            ]
-
-            # Set environment with OAuth token
-            env = {**os.environ}
-            env["CLAUDE_CODE_OAUTH_TOKEN"] = settings.claude_code_oauth_token
-
-            logger.info(
-                "calling_claude_code_headless",
-                model=settings.anthropic_model,
-                max_turns=settings.claude_max_turns,
-                timeout=settings.claude_timeout,
-            )
-
             # Run claude CLI
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                env=env,
-            )
-
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=settings.claude_timeout,
-                )
-            except asyncio.TimeoutError:
-                process.kill()
-                await process.communicate()
-                raise RuntimeError(
-                    f"Claude Code timed out after {settings.claude_timeout}s"
+            with tracer.start_as_current_span(
+                "claude_code_call", attributes={"claude.model": settings.anthropic_model}
+            ) as span:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    env=env,
+                    limit=STREAM_LINE_LIMIT,
                 )
 
-            stdout_str = stdout.decode("utf-8", errors="replace")
-            stderr_str = stderr.decode("utf-8", errors="replace")
+                # Drain stderr concurrently so a full pipe never stalls the CLI
+                stderr_task = asyncio.create_task(self._read_tail(process.stderr))
 
-            if stderr_str:
-                logger.debug("claude_code_stderr", stderr=stderr_str[:500])
+                try:
+                    output = await asyncio.wait_for(
+                        self._consume_stream(process, tools_used),
+                        timeout=settings.claude_timeout,
+                    )
+                except BaseException as e:
+                    # Whatever went wrong (including cancellation), never leave
+                    # the CLI and its MCP servers running
+                    await self._kill(process)
+                    stderr_task.cancel()
+                    await asyncio.gather(stderr_task, return_exceptions=True)
+                    if isinstance(e, ValueError):
+                        # StreamReader refuses lines longer than STREAM_LINE_LIMIT
+                        raise RuntimeError(
+                            f"Claude Code emitted an event over {STREAM_LINE_LIMIT} bytes"
+                        ) from e
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise RuntimeError(
+                            f"Claude Code timed out after {settings.claude_timeout}s"
+                        )
+                    raise
+
+                stderr = await stderr_task
+                span.set_attribute("claude.returncode", process.returncode)
+
+            # Only decode the stderr preview that is actually logged
+            if stderr and logger.is_enabled_for(logging.DEBUG):
+                logger.debug(
+                    "claude_code_stderr", stderr=stderr[-500:].decode("utf-8", errors="replace")
+                )
 
             if process.returncode != 0:
+                stderr_str = stderr[-1000:].decode("utf-8", errors="replace")
                 logger.error(
                     "claude_code_failed",
                     returncode=process.returncode,
-                    stderr=stderr_str[:1000],
+                    stderr=stderr_str,
                 )
                 raise RuntimeError(
-                    f"Claude Code exited with code {process.returncode}: {stderr_str[:500]}"
+                    f"Claude Code exited with code {process.returncode}: {stderr_str[-500:]}"
                 )
 
-            # Parse JSON output
-            try:
-                output = json.loads(stdout_str)
-            except json.JSONDecodeError as e:
-                logger.error(
-                    "claude_code_invalid_json",
-                    error=str(e),
-                    stdout_preview=stdout_str[:500],
-                )
-                raise RuntimeError(f"Failed to parse Claude Code output: {str(e)}")
+            if output is None:
+                logger.error("claude_code_missing_result")
+                raise RuntimeError("Claude Code output contained no result event")
 
-            # Extract HTML from result
-            report_html = output.get("result", "")
+            # The final reply is only a confirmation, so the file is the report
+            try:
+                with open(report_path, encoding="utf-8", errors="replace") as report_file:
+                    report_html = report_file.read()
+            except FileNotFoundError:
+                logger.error("claude_code_report_file_missing", path=report_path)
+                raise RuntimeError("Claude Code did not write the report file")
 
             # Clean up any accidental text before HTML
-            if "<!DOCTYPE" in report_html:
-                report_html = report_html[report_html.index("<!DOCTYPE"):]
-            elif "<html" in report_html.lower():
-                html_start = report_html.lower().index("<html")
-                report_html = report_html[html_start:]
-
-            if not report_html.strip():
-                raise RuntimeError("Claude Code returned empty result")
-
-            # Build metadata
-            metadata = {
-                "model": settings.anthropic_model,
-                "num_turns": output.get("num_turns", 0),
-                "session_id": output.get("session_id", ""),
-                "total_cost_usd": output.get("cost_usd", 0.0),
-                "input_tokens": output.get("usage", {}).get("input_tokens", 0),
-                "output_tokens": output.get("usage", {}).get("output_tokens", 0),
-                "mcp_servers_used": ["kubernetes", "prometheus"],
-                # Legacy fields for backward compatibility
-                "tools_used": [],
-                "tools_failed": [],
-                "prometheus_available": None,  # Cannot be determined with Claude Code headless
-            }
+            match = _HTML_START.search(report_html)
+            if not match:
+                logger.error("claude_code_report_not_html", report_length=len(report_html))
+                raise RuntimeError("Claude Code report file does not contain HTML")
+            if match.start():
+                report_html = report_html[match.start():]
+        finally:
+            try:
+                os.unlink(report_path)
+            except OSError:
+                pass
+
+        # Build metadata
+        metadata = {
+            "model": settings.anthropic_model,
+            "num_turns": output.get("num_turns", 0),
+            "session_id": output.get("session_id", ""),
+            "total_cost_usd": output.get("total_cost_usd", output.get("cost_usd", 0.0)),
+            "input_tokens": output.get("usage", {}).get("input_tokens", 0),
+            "output_tokens": output.get("usage", {}).get("output_tokens", 0),
+            "mcp_servers_used": ["kubernetes", "prometheus"],
+            "tools_used": list(tools_used),
+            # Legacy fields for backward compatibility
+            "tools_failed": [],
+            "prometheus_available": None,  # Cannot be determined with Claude Code headless
+        }
 
-            logger.info(
-                "weekly_report_generated",
-                report_length=len(report_html),
-                num_turns=metadata["num_turns"],
-                cost_usd=metadata["total_cost_usd"],
-            )
+        logger.info(
+            "weekly_report_generated",
+            report_length=len(report_html),
+            num_turns=metadata["num_turns"],
+            cost_usd=metadata["total_cost_usd"],
+        )
 
-            return report_html, metadata
+        return report_html, metadata
 
-        finally:
-            # Clean up temp files
-            for path in [mcp_config_path, prompt_path]:
-                try:
-                    os.unlink(path)
-                except OSError:
-                    pass
@@ -1,26 +1,7 @@
-def get_system_prompt(language: str = "spanish", cluster_name: str = "default") -> str:
-    """Generate system prompt for the AI agent.
+from functools import lru_cache
 
-    Args:
-        language: Language for the report
-        cluster_name: Name of the Kubernetes cluster
-
-    Returns:
-        System prompt string
-    """
-    language_instruction = ""
-    if language and language.lower() != "english":
-        language_instruction = f"""
-IMPORTANT: Generate the complete report in {language}.
-All text, headers, descriptions, and recommendations must be in {language}.
-"""
-    else:
-        language_instruction = """
-IMPORTANT: Generate the complete report in English.
-All text, headers, descriptions, and recommendations must be in English.
-"""
-
-    return f"""You are an expert Kubernetes cluster analyst with access to observability tools.
+# System prompt body; filled by str.format, so literal CSS braces are doubled
+_SYSTEM_PROMPT_TEMPLATE = """You are an expert Kubernetes cluster analyst with access to observability tools.
 
 CONTEXT:
 - Cluster: {cluster_name}
@@ -59,13 +40,15 @@ YOUR REPORT MUST INCLUDE EXACTLY 4 SECTIONS:
    - Specific and actionable
 
 OUTPUT FORMAT:
-You MUST generate your response as a complete and valid HTML document.
+Write the report as a complete and valid HTML document to the file given in
+the user instructions, using the Write tool.
 
-IMPORTANT: Generate ONLY the HTML. DO NOT wrap it in markdown code blocks.
-Start directly with <!DOCTYPE html> and end with </html>.
+IMPORTANT: The file content must be ONLY the HTML. DO NOT wrap it in markdown code blocks.
+The file starts directly with <!DOCTYPE html> and ends with </html>.
+Your final reply is NOT the report: after writing the file, reply with a short confirmation only.
 
-REQUIRED HTML STRUCTURE:
-- Generate a complete HTML document starting with <!DOCTYPE html>
+REQUIRED HTML STRUCTURE (for the file content):
+- The document starts with <!DOCTYPE html>
 - Include a <head> section with charset and styles
 - Use inline CSS within a <style> tag in the <head>
 - Create a visually attractive design using Helmcode brand colors:
@@ -126,3 +109,33 @@ Be specific with pod/node names (in code tags). Focus on actionable insights.
 Use emojis for health indicators. Make the design professional and visually attractive.
 {language_instruction}
 """
+
+_LANGUAGE_INSTRUCTION_TEMPLATE = """
+IMPORTANT: Generate the complete report in {language}.
+All text, headers, descriptions, and recommendations must be in {language}.
+"""
+
+
+def get_system_prompt(language: str = "spanish", cluster_name: str = "default") -> str:
+    """Generate system prompt for the AI agent.
+
+    Args:
+        language: Language for the report
+        cluster_name: Name of the Kubernetes cluster
+
+    Returns:
+        System prompt string
+    """
+    # Every spelling of English (or no language) renders the same prompt
+    if not language or language.lower() == "english":
+        language = "English"
+    return _build_system_prompt(language, cluster_name)
+
+
+@lru_cache(maxsize=8)
+def _build_system_prompt(language: str, cluster_name: str) -> str:
+    """Render the system prompt once per (language, cluster) pair."""
+    return _SYSTEM_PROMPT_TEMPLATE.format_map({
+        "cluster_name": cluster_name,
+        "language_instruction": _LANGUAGE_INSTRUCTION_TEMPLATE.format(language=language),
+    })
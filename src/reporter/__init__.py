@@ -1,3 +1,4 @@
 from .slack import SlackReporter
+from .messages import build_tools_info_message
 
-__all__ = ["SlackReporter"]
+__all__ = ["SlackReporter", "build_tools_info_message"]
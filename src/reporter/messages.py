@@ -0,0 +1,63 @@
+from typing import Optional
+
+from src.config import get_settings
+
+# Default title line of the Slack report message
+DEFAULT_TITLE = "🤖 *Weekly Cluster Health Report*"
+
+# Static header of the Slack message, formatted once per report
+_TOOLS_INFO_HEADER = (
+    "{title}\n"
+    "⏱️ Generation time: {generation_time:.1f}s\n"
+    "🔧 Cluster: `{cluster}`"
+)
+
+
+def build_tools_info_message(
+    metadata: dict,
+    generation_time: float,
+    *,
+    cluster: Optional[str] = None,
+    title: str = DEFAULT_TITLE,
+) -> str:
+    """Build informative message about tools used in report generation.
+
+    Args:
+        metadata: Report generation metadata
+        generation_time: Time taken to generate report (seconds)
+        cluster: Cluster name shown in the header. Uses settings if not provided.
+        title: Header line of the message
+
+    Returns:
+        Formatted message string for Slack
+    """
+    message_parts = [
+        _TOOLS_INFO_HEADER.format(
+            title=title,
+            generation_time=generation_time,
+            cluster=cluster or get_settings().cluster_name,
+        )
+    ]
+
+    if metadata.get("model"):
+        message_parts.append(f"🧠 Model: `{metadata['model']}`")
+
+    if metadata.get("mcp_servers_used"):
+        servers = ", ".join(f"`{s}`" for s in metadata["mcp_servers_used"])
+        message_parts.append(f"📡 MCP Servers: {servers}")
+
+    if metadata.get("num_turns"):
+        message_parts.append(f"🔄 Agent turns: {metadata['num_turns']}")
+
+    if metadata.get("total_cost_usd"):
+        message_parts.append(f"💰 Cost: ${metadata['total_cost_usd']:.4f}")
+
+    # Legacy fields support
+    if metadata.get("tools_used"):
+        tools = ", ".join(f"`{t}`" for t in metadata["tools_used"][:5])
+        message_parts.append(f"🛠️ Tools used: {tools}")
+
+    if metadata.get("total_tool_calls"):
+        message_parts.append(f"📝 Total tool calls: {metadata['total_tool_calls']}")
+
+    return "\n".join(message_parts)
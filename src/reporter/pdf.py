@@ -0,0 +1,80 @@
+import asyncio
+from typing import Any, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+class ChromiumPDFRenderer:
+    """Render HTML to PDF with a long-lived headless Chromium.
+
+    Requires the optional ``chromium`` extra (Playwright) and a browser
+    installed with ``playwright install chromium``. The browser is launched
+    on first use and reused for every later render. If the first start
+    fails, the renderer stays disabled and every render raises at once.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the renderer without starting a browser."""
+        self._playwright: Optional[Any] = None
+        self._browser: Optional[Any] = None
+        self._context: Optional[Any] = None
+        self._start_failed = False
+        self._start_lock = asyncio.Lock()
+
+    async def _ensure_started(self) -> Any:
+        """Launch Chromium if needed and return the shared browser context."""
+        async with self._start_lock:
+            if self._start_failed:
+                raise RuntimeError("Chromium PDF renderer failed to start earlier")
+
+            if self._context is None:
+                try:
+                    from playwright.async_api import async_playwright
+
+                    self._playwright = await async_playwright().start()
+                    self._browser = await self._playwright.chromium.launch(args=["--no-sandbox"])
+                    self._context = await self._browser.new_context()
+                except Exception:
+                    # Stop the half-started driver instead of leaking one per report
+                    self._start_failed = True
+                    try:
+                        await self.close()
+                    except Exception as e:
+                        logger.warning("chromium_pdf_renderer_cleanup_failed", error=str(e))
+                        self._context = None
+                        self._browser = None
+                        self._playwright = None
+                    raise
+                logger.info("chromium_pdf_renderer_started")
+
+        return self._context
+
+    async def render(self, html_content: str) -> bytes:
+        """Convert HTML to PDF.
+
+        Args:
+            html_content: HTML content string
+
+        Returns:
+            PDF as bytes
+        """
+        context = await self._ensure_started()
+        page = await context.new_page()
+        try:
+            await page.set_content(html_content, wait_until="load")
+            return await page.pdf(format="A4", print_background=True)
+        finally:
+            await page.close()
+
+    async def close(self) -> None:
+        """Shut down the browser if it was started."""
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+        self._context = None
+        self._browser = None
+        self._playwright = None
@@ -1,19 +1,54 @@
+import asyncio
+import multiprocessing
 import httpx
 import structlog
+from concurrent.futures import Executor, ProcessPoolExecutor
 from typing import Optional
-from io import BytesIO
 from weasyprint import HTML
 
-from src.config import settings
+from src.config import get_settings
+from src.reporter.pdf import ChromiumPDFRenderer
 
 logger = structlog.get_logger()
 
 
+def _html_to_pdf(html_content: str) -> bytes:
+    """Convert HTML to PDF using WeasyPrint.
+
+    Module-level so it can be pickled into a process pool.
+
+    Args:
+        html_content: HTML content string
+
+    Returns:
+        PDF as bytes
+    """
+    # With no target WeasyPrint returns the PDF bytes directly
+    return HTML(string=html_content).write_pdf()
+
+
 class SlackReporter:
     """Send reports to Slack via webhooks and bot API."""
 
-    def __init__(self) -> None:
-        """Initialize Slack reporter."""
+    def __init__(self, pdf_executor: Optional[Executor] = None) -> None:
+        """Initialize Slack reporter.
+
+        Args:
+            pdf_executor: Executor used to render PDFs. Defaults to a
+                single-process pool owned (and shut down) by the reporter.
+        """
+        settings = get_settings()
+        # WeasyPrint is CPU-bound and mostly holds the GIL, so it runs in its
+        # own interpreter. Spawned rather than forked because the app already
+        # runs threads (aiosqlite, the default executor).
+        self._owns_pdf_executor = pdf_executor is None
+        self.pdf_executor = pdf_executor or ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        )
+        # Optional Chromium renderer; WeasyPrint stays the default and fallback
+        self._chromium = ChromiumPDFRenderer() if settings.pdf_renderer == "chromium" else None
+        # One pooled HTTP/2 client for every Slack call made by this reporter
+        self._client = httpx.AsyncClient(timeout=60.0, http2=True)
         self.webhook_url = settings.slack_webhook_url
         self.bot_token = settings.slack_bot_token
         self.channel = settings.slack_channel
@@ -22,21 +57,29 @@ class SlackReporter:
             "slack_reporter_initialized",
             has_webhook=bool(self.webhook_url),
             has_bot_token=bool(self.bot_token),
+            pdf_renderer="chromium" if self._chromium else "weasyprint",
         )
 
+    async def close(self) -> None:
+        """Close the shared HTTP client, the browser and the PDF pool if owned."""
+        await self._client.aclose()
+        if self._chromium is not None:
+            await self._chromium.close()
+        if self._owns_pdf_executor:
+            self.pdf_executor.shutdown(wait=False, cancel_futures=True)
+
     async def send_message(self, text: str) -> None:
         """Send a text message to Slack.
 
         Args:
             text: Message text
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.webhook_url,
-                json={"text": text},
-                timeout=30.0,
-            )
-            response.raise_for_status()
+        response = await self._client.post(
+            self.webhook_url,
+            json={"text": text},
+            timeout=30.0,
+        )
+        response.raise_for_status()
 
         logger.info("slack_message_sent", text_length=len(text))
 
@@ -60,7 +103,7 @@ class SlackReporter:
         if self.bot_token and self.channel:
             # Convert HTML to PDF
             logger.info("converting_html_to_pdf", html_size=len(html_content))
-            pdf_bytes = self._html_to_pdf(html_content)
+            pdf_bytes = await self._render_pdf(html_content)
             logger.info("pdf_generated", pdf_size=len(pdf_bytes))
 
             # Upload PDF file using Slack Bot API
@@ -73,8 +116,8 @@ class SlackReporter:
                 "⚠️ Note: Configure SLACK_BOT_TOKEN and SLACK_CHANNEL to receive the full PDF report."
             )
 
-    def _html_to_pdf(self, html_content: str) -> bytes:
-        """Convert HTML to PDF using WeasyPrint.
+    async def _render_pdf(self, html_content: str) -> bytes:
+        """Render HTML to PDF with the configured renderer.
 
         Args:
             html_content: HTML content string
@@ -82,10 +125,16 @@ class SlackReporter:
         Returns:
             PDF as bytes
         """
-        # Create PDF in memory
-        pdf_buffer = BytesIO()
-        HTML(string=html_content).write_pdf(pdf_buffer)
-        return pdf_buffer.getvalue()
+        if self._chromium is not None:
+            try:
+                return await self._chromium.render(html_content)
+            except Exception as e:
+                logger.warning("chromium_pdf_failed_using_weasyprint", error=str(e))
+
+        # WeasyPrint is CPU-bound; render off the event loop
+        return await asyncio.get_running_loop().run_in_executor(
+            self.pdf_executor, _html_to_pdf, html_content
+        )
 
     async def _upload_file_bytes(
         self,
@@ -112,73 +161,72 @@ class SlackReporter:
 
         file_size = len(content)
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            # Step 1: Get upload URL (form-urlencoded)
-            step1_data = {
-                "filename": filename,
-                "length": str(file_size),
-            }
+        # Step 1: Get upload URL (form-urlencoded)
+        step1_data = {
+            "filename": filename,
+            "length": str(file_size),
+        }
 
-            logger.info("requesting_upload_url", filename=filename, size=file_size)
+        logger.info("requesting_upload_url", filename=filename, size=file_size)
 
-            step1_response = await client.post(
-                "https://slack.com/api/files.getUploadURLExternal",
-                headers=auth_headers,
-                data=step1_data,
-            )
-            step1_response.raise_for_status()
-            step1_result = step1_response.json()
+        step1_response = await self._client.post(
+            "https://slack.com/api/files.getUploadURLExternal",
+            headers=auth_headers,
+            data=step1_data,
+        )
+        step1_response.raise_for_status()
+        step1_result = step1_response.json()
 
-            logger.info("step1_response", result=step1_result)
+        logger.info("step1_response", result=step1_result)
 
-            if not step1_result.get("ok"):
-                error_msg = step1_result.get('error', 'Unknown error')
-                logger.error("slack_api_step1_failed", error=error_msg, response=step1_result)
-                raise RuntimeError(f"Slack API error (step 1): {error_msg}")
+        if not step1_result.get("ok"):
+            error_msg = step1_result.get('error', 'Unknown error')
+            logger.error("slack_api_step1_failed", error=error_msg, response=step1_result)
+            raise RuntimeError(f"Slack API error (step 1): {error_msg}")
 
-            upload_url = step1_result["upload_url"]
-            file_id = step1_result["file_id"]
+        upload_url = step1_result["upload_url"]
+        file_id = step1_result["file_id"]
 
-            logger.info("slack_upload_url_obtained", file_id=file_id)
+        logger.info("slack_upload_url_obtained", file_id=file_id)
 
-            # Step 2: Upload to external URL
-            step2_response = await client.post(
-                upload_url,
-                content=content,
-                headers={"Content-Type": content_type},
-            )
-            step2_response.raise_for_status()
-
-            logger.info("slack_file_uploaded_to_external", file_id=file_id, status=step2_response.status_code)
-
-            # Step 3: Complete upload and share to channel (form-urlencoded with JSON string)
-            import json
-            step3_data = {
-                "files": json.dumps([
-                    {
-                        "id": file_id,
-                        "title": "Weekly Cluster Health Report",
-                    }
-                ]),
-                "channel_id": self.channel,
-            }
-
-            if message:
-                step3_data["initial_comment"] = message
-
-            step3_response = await client.post(
-                "https://slack.com/api/files.completeUploadExternal",
-                headers=auth_headers,
-                data=step3_data,
-            )
-            step3_response.raise_for_status()
-            step3_result = step3_response.json()
+        # Step 2: Upload to external URL
+        step2_response = await self._client.post(
+            upload_url,
+            content=content,
+            headers={"Content-Type": content_type},
+        )
+        step2_response.raise_for_status()
+
+        logger.info("slack_file_uploaded_to_external", file_id=file_id, status=step2_response.status_code)
+
+        # Step 3: Complete upload and share to channel (form-urlencoded with JSON string)
+        import json
+        step3_data = {
+            "files": json.dumps([
+                {
+                    "id": file_id,
+                    "title": "Weekly Cluster Health Report",
+                }
+            ]),
+            "channel_id": self.channel,
+        }
+
+        if message:
+            step3_data["initial_comment"] = message
+
+        step3_response = await self._client.post(
+            "https://slack.com/api/files.completeUploadExternal",
+            headers=auth_headers,
+            data=step3_data,
+        )
+        step3_response.raise_for_status()
+        step3_result = step3_response.json()
 
-            logger.info("step3_response", result=step3_result)
+        logger.info("step3_response", result=step3_result)
 
-            if not step3_result.get("ok"):
-                error_msg = step3_result.get('error', 'Unknown error')
-                logger.error("slack_api_step3_failed", error=error_msg, response=step3_result)
-                raise RuntimeError(f"Slack API error (step 3): {error_msg}")
+        if not step3_result.get("ok"):
+            error_msg = step3_result.get('error', 'Unknown error')
+            logger.error("slack_api_step3_failed", error=error_msg, response=step3_result)
+            raise RuntimeError(f"Slack API error (step 3): {error_msg}")
 
         logger.info("slack_file_shared", filename=filename, channel=self.channel, file_id=file_id)
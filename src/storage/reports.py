@@ -1,16 +1,52 @@
+import asyncio
+import time
 import aiosqlite
 import structlog
-from datetime import datetime, timedelta
+import orjson
+import zstandard
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
-from src.config import settings
+from src.config import get_settings
 
 logger = structlog.get_logger()
 
+# Seconds report statistics are served from memory before re-querying
+STATS_CACHE_TTL = 5.0
+
+# Seconds the latest report is served from memory before re-querying
+LATEST_REPORT_CACHE_TTL = 30.0
+
+# Rows deleted per statement by cleanup_old_reports
+CLEANUP_BATCH_SIZE = 500
+
+# Prepared statements kept per connection (sqlite3's default is 128)
+CACHED_STATEMENTS = 256
+
+# Job status updates, one fixed statement per timestamp column so both stay
+# in the statement cache
+_SQL_UPDATE_JOB_STARTED = """
+    UPDATE jobs
+    SET status = ?, result = ?, error = ?,
+        started_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now')
+    WHERE id = ?
+"""
+_SQL_UPDATE_JOB_COMPLETED = """
+    UPDATE jobs
+    SET status = ?, result = ?, error = ?,
+        completed_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now')
+    WHERE id = ?
+"""
+
 
 class ReportStorage:
-    """Manages report storage in SQLite database."""
+    """Manages report storage in SQLite database.
+
+    Keeps two long-lived connections: a single writer (autocommit, guarded
+    by a lock so transactions never interleave) and a read-only reader.
+    With WAL enabled, reads never wait for the writer.
+    """
 
     def __init__(self, db_path: Optional[str] = None) -> None:
         """Initialize report storage.
@@ -18,14 +54,79 @@ class ReportStorage:
         Args:
             db_path: Path to SQLite database file. Uses settings if not provided.
         """
-        self.db_path = db_path or settings.sqlite_path
+        self.db_path = db_path or get_settings().sqlite_path
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
 
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._reader: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._stats_cache: Optional[tuple[float, dict]] = None
+        self._latest_cache: Optional[tuple[float, Optional[dict]]] = None
+        # Report HTML is stored zstd-compressed; contexts are reused across calls
+        self._compressor = zstandard.ZstdCompressor(level=9)
+        self._decompressor = zstandard.ZstdDecompressor()
+
         logger.info("report_storage_initialized", db_path=self.db_path)
 
+    async def _open_connection(self, database: str, **kwargs: Any) -> aiosqlite.Connection:
+        """Open a connection with per-connection PRAGMAs applied.
+
+        Args:
+            database: Database path or URI
+            **kwargs: Extra arguments passed to aiosqlite.connect()
+
+        Returns:
+            Open aiosqlite connection
+        """
+        db = await aiosqlite.connect(database, cached_statements=CACHED_STATEMENTS, **kwargs)
+        db.row_factory = aiosqlite.Row
+        await db.execute("PRAGMA busy_timeout=5000")
+        # Safe with WAL: durability is only relaxed for the last commits on power loss
+        await db.execute("PRAGMA synchronous=NORMAL")
+        await db.execute("PRAGMA temp_store=MEMORY")
+        # Serve reads from a 256 MiB memory map and keep ~20 MB of pages cached
+        await db.execute("PRAGMA mmap_size=268435456")
+        await db.execute("PRAGMA cache_size=-20000")
+        return db
+
+    @asynccontextmanager
+    async def _write(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Yield the writer connection with exclusive access.
+
+        Yields:
+            Writer connection (autocommit mode)
+        """
+        if self._writer is None:
+            raise RuntimeError("ReportStorage not initialized")
+        async with self._write_lock:
+            yield self._writer
+
+    @property
+    def _read(self) -> aiosqlite.Connection:
+        """Return the read-only connection."""
+        if self._reader is None:
+            raise RuntimeError("ReportStorage not initialized")
+        return self._reader
+
+    async def close(self) -> None:
+        """Close database connections."""
+        for db in (self._reader, self._writer):
+            if db is not None:
+                await db.close()
+        self._reader = None
+        self._writer = None
+
+        logger.info("report_storage_closed", db_path=self.db_path)
+
     async def initialize(self) -> None:
-        """Initialize database schema."""
-        async with aiosqlite.connect(self.db_path) as db:
+        """Open connections and initialize database schema."""
+        if self._writer is None:
+            self._writer = await self._open_connection(self.db_path, isolation_level=None)
+
+        async with self._write() as db:
+            # WAL is persistent: readers no longer block the worker's writes
+            await db.execute("PRAGMA journal_mode=WAL")
+
             # Reports table
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS reports (
@@ -34,15 +135,87 @@ class ReportStorage:
                     generated_at TIMESTAMP NOT NULL,
                     report_html TEXT NOT NULL,
                     report_size INTEGER NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    report_html_zstd BLOB
                 )
             """)
 
+            # Migrate databases created before reports were compressed
+            async with db.execute("PRAGMA table_info(reports)") as cursor:
+                report_columns = {row[1] for row in await cursor.fetchall()}
+            if "report_html_zstd" not in report_columns:
+                await db.execute("ALTER TABLE reports ADD COLUMN report_html_zstd BLOB")
+
             await db.execute("""
                 CREATE INDEX IF NOT EXISTS idx_reports_cluster_generated 
                 ON reports(cluster_name, generated_at DESC)
             """)
 
+            # Per-cluster rollup kept current by triggers, so stats are one row lookup
+            async with db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reports_stats'"
+            ) as cursor:
+                has_stats_table = await cursor.fetchone() is not None
+
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS reports_stats (
+                    cluster_name TEXT PRIMARY KEY,
+                    total_reports INTEGER NOT NULL DEFAULT 0,
+                    total_size INTEGER NOT NULL DEFAULT 0,
+                    min_at TIMESTAMP,
+                    max_at TIMESTAMP
+                )
+            """)
+
+            await db.execute("""
+                CREATE TRIGGER IF NOT EXISTS reports_stats_insert
+                AFTER INSERT ON reports
+                BEGIN
+                    INSERT INTO reports_stats (
+                        cluster_name, total_reports, total_size, min_at, max_at
+                    )
+                    VALUES (NEW.cluster_name, 1, NEW.report_size, NEW.generated_at, NEW.generated_at)
+                    ON CONFLICT(cluster_name) DO UPDATE SET
+                        total_reports = total_reports + 1,
+                        total_size = total_size + excluded.total_size,
+                        min_at = COALESCE(MIN(min_at, excluded.min_at), excluded.min_at),
+                        max_at = COALESCE(MAX(max_at, excluded.max_at), excluded.max_at);
+                END
+            """)
+
+            # MIN/MAX cannot be maintained incrementally on delete; the
+            # cluster index turns each recomputation into a single seek
+            await db.execute("""
+                CREATE TRIGGER IF NOT EXISTS reports_stats_delete
+                AFTER DELETE ON reports
+                BEGIN
+                    UPDATE reports_stats SET
+                        total_reports = total_reports - 1,
+                        total_size = total_size - OLD.report_size,
+                        min_at = (
+                            SELECT MIN(generated_at) FROM reports
+                            WHERE cluster_name = OLD.cluster_name
+                        ),
+                        max_at = (
+                            SELECT MAX(generated_at) FROM reports
+                            WHERE cluster_name = OLD.cluster_name
+                        )
+                    WHERE cluster_name = OLD.cluster_name;
+                END
+            """)
+
+            # Backfill the rollup for databases created before it existed
+            if not has_stats_table:
+                await db.execute("""
+                    INSERT INTO reports_stats (
+                        cluster_name, total_reports, total_size, min_at, max_at
+                    )
+                    SELECT cluster_name, COUNT(*), SUM(report_size),
+                           MIN(generated_at), MAX(generated_at)
+                    FROM reports
+                    GROUP BY cluster_name
+                """)
+
             # Jobs table for queue system
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS jobs (
@@ -55,49 +228,74 @@ class ReportStorage:
                     completed_at TIMESTAMP,
                     result TEXT,
                     error TEXT,
-                    retry_count INTEGER DEFAULT 0
+                    retry_count INTEGER DEFAULT 0,
+                    available_at TIMESTAMP
                 )
             """)
 
+            # Migrate databases created before retry backoff existed
+            async with db.execute("PRAGMA table_info(jobs)") as cursor:
+                job_columns = {row[1] for row in await cursor.fetchall()}
+            if "available_at" not in job_columns:
+                await db.execute("ALTER TABLE jobs ADD COLUMN available_at TIMESTAMP")
+
+            # Pending jobs are looked up by id through the partial index below;
+            # the old (status, created_at) index would shadow it in the planner
+            await db.execute("DROP INDEX IF EXISTS idx_jobs_status_created")
+
+            # Partial index: stays tiny since almost all jobs are completed
             await db.execute("""
-                CREATE INDEX IF NOT EXISTS idx_jobs_status_created
-                ON jobs(status, created_at ASC)
+                CREATE INDEX IF NOT EXISTS idx_jobs_pending
+                ON jobs(id) WHERE status = 'pending'
             """)
 
-            await db.commit()
+        if self._reader is None:
+            self._reader = await self._open_connection(
+                f"{Path(self.db_path).resolve().as_uri()}?mode=ro", uri=True
+            )
 
         logger.info("database_initialized")
 
     async def save_report(self, html_content: str) -> int:
         """Save a generated report.
 
+        The HTML is stored zstd-compressed in report_html_zstd; report_html
+        is left empty for new rows and report_size keeps the original length.
+        Timestamps are produced by SQLite as UTC ISO-8601 strings.
+
         Args:
             html_content: HTML report content
 
         Returns:
             Report ID
         """
-        async with aiosqlite.connect(self.db_path) as db:
+        compressed = self._compressor.compress(html_content.encode("utf-8"))
+
+        async with self._write() as db:
             cursor = await db.execute(
                 """
-                INSERT INTO reports (cluster_name, generated_at, report_html, report_size)
-                VALUES (?, ?, ?, ?)
+                INSERT INTO reports (
+                    cluster_name, generated_at, report_html, report_html_zstd, report_size
+                )
+                VALUES (?, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'), '', ?, ?)
                 """,
                 (
-                    settings.cluster_name,
-                    datetime.now().isoformat(),
-                    html_content,
+                    get_settings().cluster_name,
+                    compressed,
                     len(html_content),
                 ),
             )
-            await db.commit()
             report_id = cursor.lastrowid
 
+        self._stats_cache = None
+        self._latest_cache = None
+
         logger.info(
             "report_saved",
             report_id=report_id,
             size=len(html_content),
-            cluster=settings.cluster_name,
+            compressed_size=len(compressed),
+            cluster=get_settings().cluster_name,
         )
 
         return report_id
@@ -105,50 +303,134 @@ class ReportStorage:
     async def get_latest_report(self) -> Optional[dict]:
         """Get the most recent report for the cluster.
 
+        The result (including "no report") is cached for
+        LATEST_REPORT_CACHE_TTL seconds and invalidated whenever reports
+        are saved or deleted.
+
         Returns:
             Report dict or None if no reports exist
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute(
-                """
-                SELECT id, cluster_name, generated_at, report_html, report_size, created_at
-                FROM reports
-                WHERE cluster_name = ?
-                ORDER BY generated_at DESC
-                LIMIT 1
-                """,
-                (settings.cluster_name,),
-            ) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    return dict(row)
+        if self._latest_cache is not None:
+            cached_at, cached = self._latest_cache
+            if time.monotonic() - cached_at < LATEST_REPORT_CACHE_TTL:
+                return dict(cached) if cached is not None else None
+
+        async with self._read.execute(
+            """
+            SELECT id, cluster_name, generated_at, report_html, report_html_zstd,
+                   report_size, created_at
+            FROM reports
+            WHERE cluster_name = ?
+            ORDER BY generated_at DESC
+            LIMIT 1
+            """,
+            (get_settings().cluster_name,),
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        report = None
+        if row:
+            report = dict(row)
+            compressed = report.pop("report_html_zstd")
+            # Rows saved before compression keep their HTML in report_html
+            if compressed is not None:
+                report["report_html"] = self._decompressor.decompress(compressed).decode("utf-8")
+
+        self._latest_cache = (time.monotonic(), report)
+
+        return dict(report) if report is not None else None
+
+    async def get_latest_report_meta(self) -> Optional[dict]:
+        """Get metadata of the most recent report, without its HTML.
+
+        Returns:
+            Dict with id, cluster_name, generated_at, report_size and
+            created_at, or None if no reports exist
+        """
+        async with self._read.execute(
+            """
+            SELECT id, cluster_name, generated_at, report_size, created_at
+            FROM reports
+            WHERE cluster_name = ?
+            ORDER BY generated_at DESC
+            LIMIT 1
+            """,
+            (get_settings().cluster_name,),
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        return dict(row) if row else None
+
+    async def get_report_html(self, report_id: int) -> Optional[str]:
+        """Get the HTML of a single report.
 
-        return None
+        Args:
+            report_id: Report ID
+
+        Returns:
+            Report HTML or None if the report does not exist
+        """
+        async with self._read.execute(
+            "SELECT report_html, report_html_zstd FROM reports WHERE id = ?",
+            (report_id,),
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        if not row:
+            return None
+
+        # Rows saved before compression keep their HTML in report_html
+        if row[1] is not None:
+            return self._decompressor.decompress(row[1]).decode("utf-8")
+        return row[0]
 
     async def cleanup_old_reports(self) -> int:
         """Remove reports older than retention period.
 
+        Deletes in batches of CLEANUP_BATCH_SIZE, each its own short write
+        transaction, releasing the write lock between batches so queue
+        writes are never stuck behind a large cleanup. Old rows are found
+        by rowid through the (cluster_name, generated_at) index, which
+        SQLite scans in either direction.
+
         Returns:
             Number of reports deleted
         """
-        cutoff_date = datetime.now() - timedelta(weeks=settings.retention_weeks)
+        settings = get_settings()
+        deleted_count = 0
+
+        while True:
+            async with self._write() as db:
+                cursor = await db.execute(
+                    """
+                    DELETE FROM reports
+                    WHERE rowid IN (
+                        SELECT rowid FROM reports
+                        WHERE cluster_name = ?
+                          AND generated_at < strftime('%Y-%m-%dT%H:%M:%fZ', 'now', ?)
+                        LIMIT ?
+                    )
+                    """,
+                    (
+                        get_settings().cluster_name,
+                        f"-{settings.retention_weeks * 7} days",
+                        CLEANUP_BATCH_SIZE,
+                    ),
+                )
+                batch_count = cursor.rowcount
 
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(
-                """
-                DELETE FROM reports
-                WHERE cluster_name = ? AND generated_at < ?
-                """,
-                (settings.cluster_name, cutoff_date.isoformat()),
-            )
-            await db.commit()
-            deleted_count = cursor.rowcount
+            deleted_count += batch_count
+            if batch_count < CLEANUP_BATCH_SIZE:
+                break
+
+        if deleted_count:
+            self._stats_cache = None
+            self._latest_cache = None
 
         logger.info(
             "old_reports_cleaned",
             deleted_count=deleted_count,
-            cutoff_date=cutoff_date.isoformat(),
+            retention_weeks=settings.retention_weeks,
         )
 
         return deleted_count
@@ -156,30 +438,36 @@ class ReportStorage:
     async def get_report_stats(self) -> dict:
         """Get statistics about stored reports.
 
+        Results are cached for STATS_CACHE_TTL seconds and invalidated
+        whenever reports are saved or deleted.
+
         Returns:
             Dict with report statistics
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute(
-                """
-                SELECT
-                    COUNT(*) as total_reports,
-                    SUM(report_size) as total_size,
-                    MAX(generated_at) as latest_report_date,
-                    MIN(generated_at) as oldest_report_date
-                FROM reports
-                WHERE cluster_name = ?
-                """,
-                (settings.cluster_name,),
-            ) as cursor:
-                row = await cursor.fetchone()
-
-                return {
-                    "total_reports": row[0] or 0,
-                    "total_size_bytes": row[1] or 0,
-                    "latest_report_date": row[2],
-                    "oldest_report_date": row[3],
-                }
+        if self._stats_cache is not None:
+            cached_at, stats = self._stats_cache
+            if time.monotonic() - cached_at < STATS_CACHE_TTL:
+                return dict(stats)
+
+        async with self._read.execute(
+            """
+            SELECT total_reports, total_size, max_at, min_at
+            FROM reports_stats
+            WHERE cluster_name = ?
+            """,
+            (get_settings().cluster_name,),
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        stats = {
+            "total_reports": row[0] if row else 0,
+            "total_size_bytes": row[1] if row else 0,
+            "latest_report_date": row[2] if row else None,
+            "oldest_report_date": row[3] if row else None,
+        }
+        self._stats_cache = (time.monotonic(), stats)
+
+        return dict(stats)
 
     # Job queue methods
 
@@ -193,43 +481,181 @@ class ReportStorage:
         Returns:
             Job ID
         """
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             cursor = await db.execute(
                 """
-                INSERT INTO jobs (type, status, payload)
-                VALUES (?, 'pending', ?)
+                INSERT INTO jobs (type, status, payload, created_at)
+                VALUES (?, 'pending', ?, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
                 """,
                 (job_type, payload),
             )
-            await db.commit()
             job_id = cursor.lastrowid
 
         logger.info("job_inserted", job_id=job_id, job_type=job_type, source="queue")
 
         return job_id
 
+    async def insert_job_if_idle(
+        self, job_type: str, payload: Optional[str] = None
+    ) -> tuple[int, bool]:
+        """Insert a job unless one of the same type is pending or processing.
+
+        The check and the insert run as a single statement, so concurrent
+        triggers cannot enqueue duplicate jobs.
+
+        Args:
+            job_type: Type of job to process (e.g., 'generate_report')
+            payload: Optional JSON payload with job data
+
+        Returns:
+            Tuple of (job ID, whether a new job was inserted). When a job is
+            already active, its ID is returned instead.
+        """
+        async with self._write() as db:
+            cursor = await db.execute(
+                """
+                INSERT INTO jobs (type, status, payload, created_at)
+                SELECT ?, 'pending', ?, strftime('%Y-%m-%dT%H:%M:%fZ', 'now')
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM jobs
+                    WHERE type = ? AND status IN ('pending', 'processing')
+                )
+                """,
+                (job_type, payload, job_type),
+            )
+
+            if cursor.rowcount:
+                job_id = cursor.lastrowid
+                created = True
+            else:
+                async with db.execute(
+                    """
+                    SELECT id FROM jobs
+                    WHERE type = ? AND status IN ('pending', 'processing')
+                    ORDER BY id ASC
+                    LIMIT 1
+                    """,
+                    (job_type,),
+                ) as select_cursor:
+                    row = await select_cursor.fetchone()
+                job_id = row[0]
+                created = False
+
+        logger.info(
+            "job_inserted" if created else "job_already_active",
+            job_id=job_id,
+            job_type=job_type,
+            source="queue",
+        )
+
+        return job_id, created
+
+    async def requeue_processing_jobs(self) -> int:
+        """Return jobs left in the processing state to pending.
+
+        Called at startup: no worker is running yet, so any job still marked
+        as processing was interrupted by a crash or restart.
+
+        Returns:
+            Number of jobs requeued
+        """
+        async with self._write() as db:
+            cursor = await db.execute(
+                """
+                UPDATE jobs
+                SET status = 'pending', started_at = NULL
+                WHERE status = 'processing'
+                """
+            )
+            requeued_count = cursor.rowcount
+
+        logger.info("processing_jobs_requeued", count=requeued_count, source="queue")
+
+        return requeued_count
+
     async def get_pending_job(self) -> Optional[dict]:
-        """Get the next pending job from the queue.
+        """Claim the next pending job from the queue.
+
+        The job is marked as processing in the same statement that selects
+        it (see claim_pending_jobs), so callers need no separate
+        update_job_status call and two workers can never get the same job.
 
         Returns:
-            Job dict or None if no pending jobs exist
+            Claimed job dict or None if no pending jobs exist
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute(
+        jobs = await self.claim_pending_jobs(limit=1)
+        return jobs[0] if jobs else None
+
+    async def claim_pending_jobs(self, limit: int = 1) -> list[dict]:
+        """Atomically claim pending jobs by marking them as processing.
+
+        Uses a single UPDATE ... RETURNING under BEGIN IMMEDIATE, so the
+        select and the status change cannot race with another worker.
+
+        Args:
+            limit: Maximum number of jobs to claim
+
+        Returns:
+            List of claimed job dicts, oldest first
+        """
+        async with self._write() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                async with db.execute(
+                    """
+                    UPDATE jobs
+                    SET status = 'processing',
+                        started_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now')
+                    WHERE id IN (
+                        SELECT id FROM jobs
+                        WHERE status = 'pending'
+                          AND (
+                              available_at IS NULL
+                              OR available_at <= strftime('%Y-%m-%dT%H:%M:%fZ', 'now')
+                          )
+                        ORDER BY id ASC
+                        LIMIT ?
+                    )
+                    RETURNING id, type, status, payload, created_at, retry_count
+                    """,
+                    (limit,),
+                ) as cursor:
+                    rows = await cursor.fetchall()
+                await db.execute("COMMIT")
+            except Exception:
+                await db.execute("ROLLBACK")
+                raise
+
+        jobs = sorted((dict(row) for row in rows), key=lambda job: job["id"])
+
+        if jobs:
+            logger.info(
+                "jobs_claimed",
+                job_ids=[job["id"] for job in jobs],
+                source="queue",
+            )
+
+        return jobs
+
+    async def release_jobs(self, job_ids: list[int]) -> None:
+        """Return claimed jobs to the pending state.
+
+        Args:
+            job_ids: IDs of jobs to release
+        """
+        async with self._write() as db:
+            # IDs are bound as one JSON array so the SQL text never varies
+            await db.execute(
                 """
-                SELECT id, type, status, payload, created_at, retry_count
-                FROM jobs
-                WHERE status = 'pending'
-                ORDER BY created_at ASC
-                LIMIT 1
+                UPDATE jobs
+                SET status = 'pending', started_at = NULL
+                WHERE status = 'processing'
+                  AND id IN (SELECT value FROM json_each(?))
                 """,
-            ) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    return dict(row)
+                (orjson.dumps(job_ids).decode(),),
+            )
 
-        return None
+        logger.info("jobs_released", job_ids=job_ids, source="queue")
 
     async def update_job_status(
         self,
@@ -246,20 +672,12 @@ class ReportStorage:
             result: Optional result data (JSON string)
             error: Optional error message if failed
         """
-        timestamp_field = (
-            "started_at" if status == "processing" else "completed_at"
+        sql = (
+            _SQL_UPDATE_JOB_STARTED if status == "processing" else _SQL_UPDATE_JOB_COMPLETED
         )
 
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                f"""
-                UPDATE jobs
-                SET status = ?, result = ?, error = ?, {timestamp_field} = ?
-                WHERE id = ?
-                """,
-                (status, result, error, datetime.now().isoformat(), job_id),
-            )
-            await db.commit()
+        async with self._write() as db:
+            await db.execute(sql, (status, result, error, job_id))
 
         logger.info(
             "job_status_updated",
@@ -268,36 +686,37 @@ class ReportStorage:
             source="queue",
         )
 
-    async def increment_job_retry(self, job_id: int) -> int:
+    async def increment_job_retry(self, job_id: int, delay_seconds: float = 0.0) -> int:
         """Increment retry count for a job.
 
         Args:
             job_id: Job ID to increment retry count
+            delay_seconds: Seconds to wait before the job can be claimed again
 
         Returns:
             New retry count
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
+        async with self._write() as db:
+            async with db.execute(
                 """
                 UPDATE jobs
-                SET retry_count = retry_count + 1, status = 'pending'
+                SET retry_count = retry_count + 1,
+                    status = 'pending',
+                    available_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now', ?)
                 WHERE id = ?
+                RETURNING retry_count, available_at
                 """,
-                (job_id,),
-            )
-            await db.commit()
-
-            async with db.execute(
-                "SELECT retry_count FROM jobs WHERE id = ?", (job_id,)
+                (f"+{delay_seconds} seconds", job_id),
             ) as cursor:
                 row = await cursor.fetchone()
-                retry_count = row[0] if row else 0
+
+        retry_count = row[0] if row else 0
 
         logger.info(
             "job_retry_incremented",
             job_id=job_id,
             retry_count=retry_count,
+            available_at=row[1] if row else None,
             source="queue",
         )
 
@@ -1,12 +1,19 @@
 """MCP server for Kubernetes read-only operations."""
 
-import json
+import asyncio
+import functools
+import heapq
 import sys
-from typing import Optional
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
 
+import orjson
 from mcp.server.fastmcp import FastMCP
 from kubernetes import client, config
 from kubernetes.client import ApiException
+from kubernetes.watch.watch import iter_resp_lines
 
 
 mcp = FastMCP("kubernetes")
@@ -19,163 +26,467 @@ except config.ConfigException:
     config.load_kube_config()
     print("Loaded kubeconfig", file=sys.stderr)
 
-core_v1 = client.CoreV1Api()
-apps_v1 = client.AppsV1Api()
+# One shared client; its pool must fit the long-lived watches plus
+# concurrent tool calls (urllib3 defaults to 4 connections per host)
+_configuration = client.Configuration.get_default_copy()
+_configuration.connection_pool_maxsize = 32
+api_client = client.ApiClient(_configuration)
+
+core_v1 = client.CoreV1Api(api_client)
+apps_v1 = client.AppsV1Api(api_client)
+
+# Seconds before an individual list/read request to the apiserver is abandoned
+REQUEST_TIMEOUT = 10
+
+# Objects requested per page when (re)listing a resource
+LIST_PAGE_SIZE = 500
+
+# Seconds a watch request stays open before it is resumed from the last resourceVersion
+WATCH_TIMEOUT_SECONDS = 300
+
+# Seconds to wait before re-listing after an unexpected watch failure
+WATCH_RETRY_DELAY = 5
+
+# Seconds an identical tool call is answered from the result cache
+RESULT_CACHE_TTL = 5.0
+
+# Maximum number of tool results kept in the result cache
+RESULT_CACHE_SIZE = 256
+
+# Annotation holding a full copy of the last applied manifest
+LAST_APPLIED_ANNOTATION = "kubectl.kubernetes.io/last-applied-configuration"
+
+
+def _load_items(response: Any) -> list[dict]:
+    """Parse a raw (``_preload_content=False``) list response into plain dicts."""
+    return orjson.loads(response.data)["items"]
+
+
+def _strip_bookkeeping(obj: dict) -> dict:
+    """Drop metadata no tool reads so cached objects stay small."""
+    metadata = obj["metadata"]
+    metadata.pop("managedFields", None)
+    annotations = metadata.get("annotations")
+    if annotations:
+        annotations.pop(LAST_APPLIED_ANNOTATION, None)
+    return obj
+
+
+@dataclass(slots=True)
+class PodRow:
+    """Output row for one pod; orjson serializes it like a dict."""
+    name: str
+    namespace: str
+    status: Optional[str]
+    restarts: int
+    node: Optional[str]
+    age: Optional[str]
+
+
+def _pod_row(pod: dict) -> PodRow:
+    """Reduce a pod to the row kubectl_get_pods returns, summing its restarts."""
+    metadata = pod["metadata"]
+    status = pod.get("status", {})
+    restarts = 0
+    container_statuses = status.get("containerStatuses")
+    if container_statuses:
+        for cs in container_statuses:
+            restarts += cs["restartCount"]
+    return PodRow(
+        metadata["name"],
+        metadata["namespace"],
+        status.get("phase"),
+        restarts,
+        pod["spec"].get("nodeName"),
+        metadata.get("creationTimestamp"),
+    )
+
+
+class ResourceCache:
+    """In-memory copy of a cluster-wide resource list, kept current by a watch.
+
+    Objects are kept as the apiserver's JSON decoded by orjson, skipping the
+    client's per-field model deserialization.
+
+    The first read does a regular LIST, so API errors reach the calling tool,
+    then a daemon thread applies watch events so later reads never hit the
+    apiserver. Watches resume from the last resourceVersion (refreshed by
+    bookmarks) and fall back to a fresh LIST when it has expired (410 Gone).
+    If RBAC forbids the watch, the cache stops watching and every read does
+    a fresh LIST instead. Every stored object first goes through ``transform``, which trims fields
+    the tools never read.
+    """
+
+    def __init__(
+        self,
+        list_func: Callable[..., Any],
+        transform: Callable[[dict], Any] = _strip_bookkeeping,
+    ) -> None:
+        self._list_func = list_func
+        self._transform = transform
+        self._objects: dict[tuple[Optional[str], str], Any] = {}
+        self._resource_version: Optional[str] = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._synced = False
+        self._watch_allowed = True
+
+    @staticmethod
+    def _key(obj: dict) -> tuple[Optional[str], str]:
+        metadata = obj["metadata"]
+        return metadata.get("namespace"), metadata["name"]
+
+    def _relist(self) -> None:
+        # Fetched in pages and transformed page by page, so raw JSON is held
+        # a page at a time rather than for the whole cluster. resource_version="0" serves the first
+        # page from the apiserver watch cache (older apiservers ignore the
+        # limit there and answer in one page); continuations must omit it.
+        transform = self._transform
+        objects = {}
+        params: dict[str, Any] = {"resource_version": "0"}
+        while True:
+            response = self._list_func(
+                limit=LIST_PAGE_SIZE,
+                _request_timeout=REQUEST_TIMEOUT,
+                _preload_content=False,
+                **params,
+            )
+            data = orjson.loads(response.data)
+            for obj in data["items"]:
+                objects[self._key(obj)] = transform(obj)
+
+            metadata = data["metadata"]
+            if not metadata.get("continue"):
+                break
+            params = {"_continue": metadata["continue"]}
+
+        with self._lock:
+            self._objects = objects
+            self._resource_version = metadata["resourceVersion"]
+
+    def _ensure_synced(self) -> None:
+        if not self._watch_allowed:
+            # No watch permission: the cache cannot stay current, so re-list
+            with self._sync_lock:
+                self._relist()
+            return
+
+        if not self._synced:
+            with self._sync_lock:
+                if not self._synced:
+                    self._relist()
+                    self._synced = True
+                    threading.Thread(target=self._watch_forever, daemon=True).start()
+
+    def start(self) -> None:
+        """Begin the initial LIST in the background.
+
+        Failures are only logged; the next read retries and reports them.
+        """
+        def warm() -> None:
+            try:
+                self._ensure_synced()
+            except Exception as e:
+                print(f"Initial list failed: {e}", file=sys.stderr)
+
+        threading.Thread(target=warm, daemon=True).start()
+
+    def items(self, namespace: Optional[str] = None) -> list[Any]:
+        """Return cached objects, optionally limited to one namespace."""
+        self._ensure_synced()
+
+        with self._lock:
+            if namespace:
+                return [obj for key, obj in self._objects.items() if key[0] == namespace]
+            return list(self._objects.values())
+
+    def _watch_forever(self) -> None:
+        while True:
+            try:
+                self._watch()
+            except ApiException as e:
+                if e.status in (401, 403):
+                    print(f"Watch not permitted, listing on every read: {e.reason}", file=sys.stderr)
+                    self._watch_allowed = False
+                    return
+                if e.status != 410:
+                    print(f"Watch failed, re-listing: {e.reason}", file=sys.stderr)
+                    time.sleep(WATCH_RETRY_DELAY)
+                self._relist_until_ok()
+            except Exception as e:
+                print(f"Watch failed, re-listing: {e}", file=sys.stderr)
+                time.sleep(WATCH_RETRY_DELAY)
+                self._relist_until_ok()
+
+    def _relist_until_ok(self) -> None:
+        while True:
+            try:
+                self._relist()
+                return
+            except Exception as e:
+                print(f"Re-list failed: {e}", file=sys.stderr)
+                time.sleep(WATCH_RETRY_DELAY)
+
+    def _watch(self) -> None:
+        response = self._list_func(
+            watch=True,
+            resource_version=self._resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=WATCH_TIMEOUT_SECONDS,
+            _request_timeout=WATCH_TIMEOUT_SECONDS + REQUEST_TIMEOUT,
+            _preload_content=False,
+        )
+        try:
+            for line in iter_resp_lines(response):
+                if not line:
+                    continue
+
+                event = orjson.loads(line)
+                event_type = event["type"]
+                obj = event["object"]
+                if event_type == "ERROR":
+                    # A Status object; 410 Gone means the resourceVersion expired
+                    raise ApiException(status=obj.get("code"), reason=obj.get("message"))
+
+                # Bookmark objects only carry a resourceVersion
+                with self._lock:
+                    if event_type == "DELETED":
+                        self._objects.pop(self._key(obj), None)
+                    elif event_type != "BOOKMARK":
+                        self._objects[self._key(obj)] = self._transform(obj)
+                    self._resource_version = obj["metadata"]["resourceVersion"]
+        finally:
+            response.release_conn()
+
+
+# Pods are stored as ready-made rows, computed once per watch event
+pod_cache = ResourceCache(core_v1.list_pod_for_all_namespaces, transform=_pod_row)
+node_cache = ResourceCache(core_v1.list_node)
+event_cache = ResourceCache(core_v1.list_event_for_all_namespaces)
+deployment_cache = ResourceCache(apps_v1.list_deployment_for_all_namespaces)
+
+
+_result_cache: dict[tuple, tuple[float, str]] = {}
+
+
+def _cached_result(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Reuse a tool's result for identical calls within RESULT_CACHE_TTL.
+
+    Agents often repeat the same read-only call a few seconds apart while
+    reasoning; those repeats skip the apiserver and the serialization.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> str:
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        cached = _result_cache.get(key)
+        if cached is not None and now - cached[0] < RESULT_CACHE_TTL:
+            return cached[1]
+
+        result = await func(*args, **kwargs)
+
+        # Entries stay in insertion order, so the first one is the oldest
+        _result_cache.pop(key, None)
+        if len(_result_cache) >= RESULT_CACHE_SIZE:
+            del _result_cache[next(iter(_result_cache))]
+        _result_cache[key] = (now, result)
+        return result
+
+    return wrapper
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool result as compact JSON; indentation only costs tokens."""
+    return orjson.dumps(obj).decode()
 
 
 @mcp.tool()
-def kubectl_get_pods(namespace: Optional[str] = None, label_selector: Optional[str] = None) -> str:
+@_cached_result
+async def kubectl_get_pods(namespace: Optional[str] = None, label_selector: Optional[str] = None) -> str:
     """List pods in a namespace. Returns pod names, status, restarts, and age."""
     try:
-        if namespace:
-            pods = core_v1.list_namespaced_pod(
-                namespace=namespace,
-                label_selector=label_selector or ""
-            )
+        # A blank selector matches everything, so it is served from the cache too
+        if label_selector and label_selector.strip():
+            # Label selectors are evaluated by the apiserver, not the cache
+            if namespace:
+                response = await asyncio.to_thread(
+                    core_v1.list_namespaced_pod,
+                    namespace=namespace,
+                    label_selector=label_selector,
+                    resource_version="0",
+                    _request_timeout=REQUEST_TIMEOUT,
+                    _preload_content=False
+                )
+            else:
+                response = await asyncio.to_thread(
+                    core_v1.list_pod_for_all_namespaces,
+                    label_selector=label_selector,
+                    resource_version="0",
+                    _request_timeout=REQUEST_TIMEOUT,
+                    _preload_content=False
+                )
+            pods = [_pod_row(pod) for pod in _load_items(response)]
         else:
-            pods = core_v1.list_pod_for_all_namespaces(
-                label_selector=label_selector or ""
-            )
+            # Cached pods are already reduced to output rows
+            pods = await asyncio.to_thread(pod_cache.items, namespace)
 
-        result = []
-        for pod in pods.items:
-            restarts = sum(cs.restart_count for cs in pod.status.container_statuses or [])
-            result.append({
-                "name": pod.metadata.name,
-                "namespace": pod.metadata.namespace,
-                "status": pod.status.phase,
-                "restarts": restarts,
-                "node": pod.spec.node_name,
-                "age": str(pod.metadata.creation_timestamp)
-            })
-
-        return json.dumps(result, indent=2)
+        return _dumps(pods)
     except ApiException as e:
         return f"Kubernetes API error: {e.reason}"
 
 
 @mcp.tool()
-def kubectl_get_nodes() -> str:
+@_cached_result
+async def kubectl_get_nodes() -> str:
     """List cluster nodes with status, roles, age, and version."""
     try:
-        nodes = core_v1.list_node()
+        nodes = await asyncio.to_thread(node_cache.items)
 
         result = []
-        for node in nodes.items:
-            conditions = {c.type: c.status for c in node.status.conditions}
-            result.append({
-                "name": node.metadata.name,
+        append = result.append
+        for node in nodes:
+            metadata = node["metadata"]
+            status = node["status"]
+            conditions = {c["type"]: c["status"] for c in status.get("conditions") or []}
+            append({
+                "name": metadata["name"],
                 "status": "Ready" if conditions.get("Ready") == "True" else "NotReady",
-                "roles": node.metadata.labels.get("node-role.kubernetes.io/control-plane", "worker"),
-                "version": node.status.node_info.kubelet_version,
-                "age": str(node.metadata.creation_timestamp)
+                "roles": metadata.get("labels", {}).get("node-role.kubernetes.io/control-plane", "worker"),
+                "version": status["nodeInfo"]["kubeletVersion"],
+                "age": metadata.get("creationTimestamp")
             })
 
-        return json.dumps(result, indent=2)
+        return _dumps(result)
     except ApiException as e:
         return f"Kubernetes API error: {e.reason}"
 
 
 @mcp.tool()
-def kubectl_describe_pod(name: str, namespace: str) -> str:
+@_cached_result
+async def kubectl_describe_pod(name: str, namespace: str) -> str:
     """Get detailed information about a specific pod including events, conditions, and container states."""
     try:
-        pod = core_v1.read_namespaced_pod(name=name, namespace=namespace)
-        events = core_v1.list_namespaced_event(
-            namespace=namespace,
-            field_selector=f"involvedObject.name={name}"
+        # resource_version="0" lets the apiserver answer the event list from its watch cache
+        pod, events = await asyncio.gather(
+            asyncio.to_thread(
+                core_v1.read_namespaced_pod,
+                name=name,
+                namespace=namespace,
+                _request_timeout=REQUEST_TIMEOUT,
+                _preload_content=False
+            ),
+            asyncio.to_thread(
+                core_v1.list_namespaced_event,
+                namespace=namespace,
+                field_selector=f"involvedObject.name={name},involvedObject.namespace={namespace}",
+                resource_version="0",
+                _request_timeout=REQUEST_TIMEOUT,
+                _preload_content=False
+            ),
         )
+        pod = orjson.loads(pod.data)
+        recent_events = sorted(
+            _load_items(events),
+            key=lambda e: e.get("lastTimestamp") or e.get("eventTime") or e["metadata"].get("creationTimestamp") or "",
+            reverse=True
+        )[:10]
+        status = pod.get("status", {})
 
         result = {
-            "name": pod.metadata.name,
-            "namespace": pod.metadata.namespace,
-            "status": pod.status.phase,
+            "name": pod["metadata"]["name"],
+            "namespace": pod["metadata"]["namespace"],
+            "status": status.get("phase"),
             "conditions": [
-                {"type": c.type, "status": c.status, "reason": c.reason}
-                for c in pod.status.conditions or []
+                {"type": c["type"], "status": c["status"], "reason": c.get("reason")}
+                for c in status.get("conditions") or []
             ],
             "containers": [
                 {
-                    "name": cs.name,
-                    "ready": cs.ready,
-                    "restarts": cs.restart_count,
-                    "state": str(cs.state)
+                    "name": cs["name"],
+                    "ready": cs["ready"],
+                    "restarts": cs["restartCount"],
+                    "state": cs.get("state")
                 }
-                for cs in pod.status.container_statuses or []
+                for cs in status.get("containerStatuses") or []
             ],
             "events": [
                 {
-                    "type": e.type,
-                    "reason": e.reason,
-                    "message": e.message,
-                    "time": str(e.last_timestamp)
+                    "type": e.get("type"),
+                    "reason": e.get("reason"),
+                    "message": e.get("message"),
+                    "time": e.get("lastTimestamp")
                 }
-                for e in events.items[-10:]
+                for e in recent_events
             ]
         }
 
-        return json.dumps(result, indent=2)
+        return _dumps(result)
     except ApiException as e:
         return f"Kubernetes API error: {e.reason}"
 
 
 @mcp.tool()
-def kubectl_get_events(namespace: Optional[str] = None, limit: int = 50) -> str:
+@_cached_result
+async def kubectl_get_events(namespace: Optional[str] = None, limit: int = 50) -> str:
     """Get recent events in a namespace, useful for debugging issues."""
     try:
-        if namespace:
-            events = core_v1.list_namespaced_event(namespace=namespace)
-        else:
-            events = core_v1.list_event_for_all_namespaces()
+        events = await asyncio.to_thread(event_cache.items, namespace)
 
-        sorted_events = sorted(
-            events.items,
-            key=lambda e: e.last_timestamp or e.event_time,
-            reverse=True
-        )[:limit]
-
-        result = [
-            {
-                "type": e.type,
-                "reason": e.reason,
-                "message": e.message,
-                "object": f"{e.involved_object.kind}/{e.involved_object.name}",
-                "namespace": e.metadata.namespace,
-                "time": str(e.last_timestamp or e.event_time)
-            }
-            for e in sorted_events
-        ]
-
-        return json.dumps(result, indent=2)
+        # Partial top-N selection: O(N log limit) rather than sorting every event
+        sorted_events = heapq.nlargest(
+            limit,
+            events,
+            key=lambda e: e.get("lastTimestamp") or e.get("eventTime") or ""
+        )
+
+        result = []
+        append = result.append
+        for e in sorted_events:
+            get = e.get
+            involved = e["involvedObject"]
+            append({
+                "type": get("type"),
+                "reason": get("reason"),
+                "message": get("message"),
+                "object": f"{involved.get('kind')}/{involved.get('name')}",
+                "namespace": e["metadata"]["namespace"],
+                "time": get("lastTimestamp") or get("eventTime")
+            })
+
+        return _dumps(result)
     except ApiException as e:
         return f"Kubernetes API error: {e.reason}"
 
 
 @mcp.tool()
-def kubectl_get_deployments(namespace: Optional[str] = None) -> str:
+@_cached_result
+async def kubectl_get_deployments(namespace: Optional[str] = None) -> str:
     """List deployments with replicas status."""
     try:
-        if namespace:
-            deployments = apps_v1.list_namespaced_deployment(namespace=namespace)
-        else:
-            deployments = apps_v1.list_deployment_for_all_namespaces()
-
-        result = [
-            {
-                "name": d.metadata.name,
-                "namespace": d.metadata.namespace,
-                "replicas": d.spec.replicas,
-                "available": d.status.available_replicas or 0,
-                "ready": d.status.ready_replicas or 0,
-                "updated": d.status.updated_replicas or 0
-            }
-            for d in deployments.items
-        ]
-
-        return json.dumps(result, indent=2)
+        deployments = await asyncio.to_thread(deployment_cache.items, namespace)
+
+        result = []
+        append = result.append
+        for d in deployments:
+            metadata = d["metadata"]
+            status = d.get("status", {})
+            append({
+                "name": metadata["name"],
+                "namespace": metadata["namespace"],
+                "replicas": d["spec"].get("replicas"),
+                "available": status.get("availableReplicas") or 0,
+                "ready": status.get("readyReplicas") or 0,
+                "updated": status.get("updatedReplicas") or 0
+            })
+
+        return _dumps(result)
     except ApiException as e:
         return f"Kubernetes API error: {e.reason}"
 
 
 if __name__ == "__main__":
+    # List every resource concurrently up front; a tool call that arrives
+    # mid-list waits for that list instead of starting its own
+    for cache in (pod_cache, node_cache, event_cache, deployment_cache):
+        cache.start()
     mcp.run(transport="stdio")
@@ -1,56 +1,232 @@
 """MCP server for Prometheus read-only operations."""
 
-import json
+import asyncio
+import functools
 import os
+import re
 import sys
 import time
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
 
 import httpx
+import orjson
 from mcp.server.fastmcp import FastMCP
 
 
-mcp = FastMCP("prometheus")
+@asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Close the shared HTTP client when the server shuts down."""
+    try:
+        yield
+    finally:
+        await _async_client.aclose()
+
+
+mcp = FastMCP("prometheus", lifespan=_lifespan)
 
 PROMETHEUS_URL = os.environ.get("PROMETHEUS_URL", "http://host.docker.internal:9090").rstrip("/")
 print(f"Prometheus URL: {PROMETHEUS_URL}", file=sys.stderr)
 
+# Upper bound on requests in flight to Prometheus across all tool calls
+try:
+    PROMETHEUS_MAX_CONCURRENCY = max(1, int(os.environ.get("PROMETHEUS_MAX_CONCURRENCY", "16")))
+except ValueError:
+    print("Invalid PROMETHEUS_MAX_CONCURRENCY, using 16", file=sys.stderr)
+    PROMETHEUS_MAX_CONCURRENCY = 16
+
+# Seconds per PromQL duration unit accepted by the range tool
+_UNIT_SECONDS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "y": 31536000}
+
+# A PromQL duration such as "1h", "1m30s" or "500ms"
+_DURATION_RE = re.compile(r"(?:\d+(?:ms|[smhdwy]))+")
+_DURATION_PART_RE = re.compile(r"(\d+)(ms|[smhdwy])")
+
+# Range statistics computed by Prometheus over a subquery, in output order
+_RANGE_FUNCTIONS = {
+    "min": "min_over_time",
+    "max": "max_over_time",
+    "avg": "avg_over_time",
+    "current": "last_over_time",
+    "samples": "count_over_time",
+}
+
+# Per-pod check queries, filled in with str.format(pod=..., namespace=...);
+# each template tuple is ordered like _POD_QUERY_NAMES
+_POD_QUERY_NAMES = ("usage", "limit", "request")
+_POD_MEMORY_QUERIES = (
+    'container_memory_usage_bytes{{pod="{pod}", namespace="{namespace}", container!=""}}',
+    'kube_pod_container_resource_limits{{pod="{pod}", namespace="{namespace}", resource="memory"}}',
+    'kube_pod_container_resource_requests{{pod="{pod}", namespace="{namespace}", resource="memory"}}'
+)
+_POD_CPU_QUERIES = (
+    'rate(container_cpu_usage_seconds_total{{pod="{pod}", namespace="{namespace}", container!=""}}[5m])',
+    'kube_pod_container_resource_limits{{pod="{pod}", namespace="{namespace}", resource="cpu"}}',
+    'kube_pod_container_resource_requests{{pod="{pod}", namespace="{namespace}", resource="cpu"}}'
+)
+
+# Label used to tell the parts of a combined query apart in its result
+_QUERY_NAME_LABEL = "watchdog_query"
+
+# Instant query endpoint, relative to the client's base_url
+_QUERY_PATH = "/api/v1/query"
+
+# Seconds a query result is reused for identical instant and range tool calls
+INSTANT_CACHE_TTL = 10.0
+RANGE_CACHE_TTL = 60.0
+
+# Maximum number of query results kept in the cache
+QUERY_CACHE_SIZE = 1024
+
+# Shared by every tool call so queries reuse warm keep-alive connections;
+# over https, concurrent queries multiplex on one HTTP/2 connection
+_async_client = httpx.AsyncClient(
+    base_url=PROMETHEUS_URL,
+    http2=True,
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=30.0),
+)
+
+
+_query_cache: dict[tuple, tuple[float, dict[str, Any]]] = {}
+_inflight_queries: dict[tuple, asyncio.Future] = {}
+_request_semaphore = asyncio.Semaphore(PROMETHEUS_MAX_CONCURRENCY)
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool result as compact JSON; indentation only costs tokens."""
+    return orjson.dumps(obj).decode()
+
+
+def _escape_label_value(value: str) -> str:
+    """Escape a string for use inside a double-quoted PromQL label matcher."""
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_duration(duration: str) -> float:
+    """Parse a PromQL duration, or a bare number of seconds, to seconds.
+
+    Raises ValueError for anything else or for a non-positive duration.
+    """
+    duration = duration.strip()
+    if _DURATION_RE.fullmatch(duration):
+        seconds = sum(
+            int(value) * _UNIT_SECONDS[unit] for value, unit in _DURATION_PART_RE.findall(duration)
+        )
+    else:
+        try:
+            seconds = float(duration)
+        except ValueError:
+            seconds = 0.0
+
+    if not 0 < seconds < float("inf"):
+        raise ValueError(f"invalid duration: {duration!r}")
+    return seconds
+
+
+async def _fetch_query(key: tuple, query: str, params: tuple) -> dict[str, Any]:
+    """Send one instant query and cache the response if it succeeded."""
+    async with _request_semaphore:
+        response = await _async_client.get(
+            _QUERY_PATH,
+            params=(("query", query), *params)
+        )
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+
+    if data["status"] == "success":
+        # Entries stay in insertion order, so the first one is the oldest
+        _query_cache.pop(key, None)
+        if len(_query_cache) >= QUERY_CACHE_SIZE:
+            del _query_cache[next(iter(_query_cache))]
+        _query_cache[key] = (time.monotonic(), data)
+    return data
+
+
+async def _instant_query(query: str, ttl: float = INSTANT_CACHE_TTL, **params: Any) -> dict[str, Any]:
+    """Run an instant query and return the decoded API response.
+
+    Successful responses are cached for ``ttl`` seconds, keyed by the query
+    and its parameters, so an agent re-checking the same pod within a
+    reasoning loop skips the round trip. Identical queries issued while one
+    is still in flight wait for that request instead of sending their own.
+    """
+    key = (query, tuple(sorted(params.items())))
+    cached = _query_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+
+    task = _inflight_queries.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_query(key, query, key[1]))
+        _inflight_queries[key] = task
+        task.add_done_callback(lambda _: _inflight_queries.pop(key, None))
+
+    # Shielded so one caller giving up does not cancel the request for the others
+    return await asyncio.shield(task)
+
+
+@functools.lru_cache(maxsize=256)
+def _pod_check_query(templates: tuple[str, ...], pod: str, namespace: str) -> str:
+    """Build the combined PromQL for one pod check.
+
+    Each template is filled in with the escaped pod and namespace and its
+    series are tagged with the matching _POD_QUERY_NAMES entry, then the
+    parts are joined with ``or`` so a single request returns every value.
+    """
+    pod_value = _escape_label_value(pod)
+    namespace_value = _escape_label_value(namespace)
+    return " or ".join(
+        f'label_replace({template.format(pod=pod_value, namespace=namespace_value)}, '
+        f'"{_QUERY_NAME_LABEL}", "{name}", "", "")'
+        for name, template in zip(_POD_QUERY_NAMES, templates)
+    )
+
+
+async def _query_first_values(names: tuple[str, ...], combined: str) -> dict[str, Any]:
+    """Run a combined query and return the first value tagged with each name.
+
+    Names without data are left out; if the request fails every name maps
+    to the error string. Connection errors are re-raised.
+    """
+    try:
+        data = await _instant_query(combined)
+    except httpx.ConnectError:
+        raise
+    except Exception as e:
+        return {name: f"Error: {str(e)}" for name in names}
 
-def _parse_duration(duration: str) -> int:
-    """Parse duration string to seconds."""
-    unit = duration[-1]
-    value = int(duration[:-1])
-    multipliers = {"s": 1, "m": 60, "h": 3600, "d": 86400}
-    return value * multipliers.get(unit, 3600)
+    results: dict[str, Any] = {}
+    if data["status"] == "success":
+        for item in data["data"]["result"]:
+            name = item["metric"].get(_QUERY_NAME_LABEL)
+            if name in names and name not in results:
+                results[name] = float(item["value"][1])
+    return results
 
 
 @mcp.tool()
-def prometheus_query(query: str) -> str:
+async def prometheus_query(query: str) -> str:
     """Execute instant PromQL query. Returns current values of metrics."""
     try:
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(
-                f"{PROMETHEUS_URL}/api/v1/query",
-                params={"query": query}
-            )
-            response.raise_for_status()
-            data = response.json()
+        data = await _instant_query(query)
 
-            if data["status"] != "success":
-                return f"Query failed: {data.get('error', 'unknown error')}"
+        if data["status"] != "success":
+            return f"Query failed: {data.get('error', 'unknown error')}"
 
-            result = data["data"]["result"]
-            if not result:
-                return "No data returned"
+        result = data["data"]["result"]
+        if not result:
+            return "No data returned"
 
-            formatted = []
-            for item in result:
-                formatted.append({
-                    "metric": item["metric"],
-                    "value": item["value"][1]
-                })
+        formatted = []
+        for item in result:
+            formatted.append({
+                "metric": item["metric"],
+                "value": item["value"][1]
+            })
 
-            return json.dumps(formatted, indent=2)
+        return _dumps(formatted)
     except httpx.ConnectError as e:
         return f"Prometheus not available: {str(e)}"
     except httpx.HTTPError as e:
@@ -58,47 +234,49 @@ def prometheus_query(query: str) -> str:
 
 
 @mcp.tool()
-def prometheus_query_range(query: str, duration: str = "1h", step: str = "1m") -> str:
+async def prometheus_query_range(query: str, duration: str = "1h", step: str = "1m") -> str:
     """Execute range PromQL query over a time period. Useful for trends."""
     try:
-        duration_seconds = _parse_duration(duration)
-        end_time = int(time.time())
-        start_time = end_time - duration_seconds
-
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(
-                f"{PROMETHEUS_URL}/api/v1/query_range",
-                params={
-                    "query": query,
-                    "start": start_time,
-                    "end": end_time,
-                    "step": step
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-
+        # Aggregate server-side over a subquery instead of downloading every sample
+        try:
+            duration_ms = round(_parse_duration(duration) * 1000)
+            step_ms = round(_parse_duration(step) * 1000)
+        except ValueError as e:
+            return f"Query failed: {e}"
+        if not duration_ms or not step_ms:
+            return "Query failed: duration and step must be at least 1ms"
+
+        window = f"({query})[{duration_ms}ms:{step_ms}ms]"
+        # Aligned to the step so repeated calls within one step share cache entries
+        end_time = int(time.time() * 1000) // step_ms * step_ms / 1000
+
+        responses = await asyncio.gather(*(
+            _instant_query(f"{function}({window})", ttl=RANGE_CACHE_TTL, time=end_time)
+            for function in _RANGE_FUNCTIONS.values()
+        ))
+
+        # last_over_time keeps the metric name while the other functions drop it,
+        # so series are matched on their labels without __name__
+        series: dict[tuple, dict[str, Any]] = {}
+        for stat, data in zip(_RANGE_FUNCTIONS, responses):
             if data["status"] != "success":
                 return f"Query failed: {data.get('error', 'unknown error')}"
 
-            result = data["data"]["result"]
-            if not result:
-                return "No data returned"
-
-            formatted = []
-            for item in result:
-                values = [float(v[1]) for v in item["values"]]
-                if values:
-                    formatted.append({
-                        "metric": item["metric"],
-                        "min": min(values),
-                        "max": max(values),
-                        "avg": sum(values) / len(values),
-                        "current": values[-1],
-                        "samples": len(values)
-                    })
-
-            return json.dumps(formatted, indent=2)
+            for item in data["data"]["result"]:
+                metric = {k: v for k, v in item["metric"].items() if k != "__name__"}
+                key = tuple(sorted(metric.items()))
+                entry = series.setdefault(key, {"metric": metric})
+                entry[stat] = float(item["value"][1])
+
+        if not series:
+            return "No data returned"
+
+        formatted = list(series.values())
+        for entry in formatted:
+            if "samples" in entry:
+                entry["samples"] = int(entry["samples"])
+
+        return _dumps(formatted)
     except httpx.ConnectError as e:
         return f"Prometheus not available: {str(e)}"
     except httpx.HTTPError as e:
@@ -106,33 +284,11 @@ def prometheus_query_range(query: str, duration: str = "1h", step: str = "1m") -
 
 
 @mcp.tool()
-def prometheus_check_pod_memory(pod: str, namespace: str) -> str:
+async def prometheus_check_pod_memory(pod: str, namespace: str) -> str:
     """Check memory usage vs limits for a specific pod. Helper to quickly identify OOM issues."""
     try:
-        queries = {
-            "usage": f'container_memory_usage_bytes{{pod="{pod}", namespace="{namespace}", container!=""}}',
-            "limit": f'kube_pod_container_resource_limits{{pod="{pod}", namespace="{namespace}", resource="memory"}}',
-            "request": f'kube_pod_container_resource_requests{{pod="{pod}", namespace="{namespace}", resource="memory"}}'
-        }
-
-        results = {}
-        with httpx.Client(timeout=30.0) as client:
-            for name, query in queries.items():
-                try:
-                    response = client.get(
-                        f"{PROMETHEUS_URL}/api/v1/query",
-                        params={"query": query}
-                    )
-                    response.raise_for_status()
-                    data = response.json()
-
-                    if data["status"] == "success" and data["data"]["result"]:
-                        value = float(data["data"]["result"][0]["value"][1])
-                        results[name] = value
-                except httpx.ConnectError as e:
-                    return f"Prometheus not available: {str(e)}"
-                except Exception as e:
-                    results[name] = f"Error: {str(e)}"
+        query = _pod_check_query(_POD_MEMORY_QUERIES, pod, namespace)
+        results = await _query_first_values(_POD_QUERY_NAMES, query)
 
         analysis = {
             "pod": pod,
@@ -145,39 +301,17 @@ def prometheus_check_pod_memory(pod: str, namespace: str) -> str:
         if isinstance(results.get("usage"), (int, float)) and isinstance(results.get("limit"), (int, float)):
             analysis["usage_vs_limit_pct"] = (results["usage"] / results["limit"]) * 100
 
-        return json.dumps(analysis, indent=2)
+        return _dumps(analysis)
     except httpx.ConnectError as e:
         return f"Prometheus not available: {str(e)}"
 
 
 @mcp.tool()
-def prometheus_check_pod_cpu(pod: str, namespace: str) -> str:
+async def prometheus_check_pod_cpu(pod: str, namespace: str) -> str:
     """Check CPU usage vs limits/requests for a specific pod."""
     try:
-        queries = {
-            "usage": f'rate(container_cpu_usage_seconds_total{{pod="{pod}", namespace="{namespace}", container!=""}}[5m])',
-            "limit": f'kube_pod_container_resource_limits{{pod="{pod}", namespace="{namespace}", resource="cpu"}}',
-            "request": f'kube_pod_container_resource_requests{{pod="{pod}", namespace="{namespace}", resource="cpu"}}'
-        }
-
-        results = {}
-        with httpx.Client(timeout=30.0) as client:
-            for name, query in queries.items():
-                try:
-                    response = client.get(
-                        f"{PROMETHEUS_URL}/api/v1/query",
-                        params={"query": query}
-                    )
-                    response.raise_for_status()
-                    data = response.json()
-
-                    if data["status"] == "success" and data["data"]["result"]:
-                        value = float(data["data"]["result"][0]["value"][1])
-                        results[name] = value
-                except httpx.ConnectError as e:
-                    return f"Prometheus not available: {str(e)}"
-                except Exception as e:
-                    results[name] = f"Error: {str(e)}"
+        query = _pod_check_query(_POD_CPU_QUERIES, pod, namespace)
+        results = await _query_first_values(_POD_QUERY_NAMES, query)
 
         analysis = {
             "pod": pod,
@@ -190,7 +324,7 @@ def prometheus_check_pod_cpu(pod: str, namespace: str) -> str:
         if isinstance(results.get("usage"), (int, float)) and isinstance(results.get("limit"), (int, float)):
             analysis["usage_vs_limit_pct"] = (results["usage"] / results["limit"]) * 100
 
-        return json.dumps(analysis, indent=2)
+        return _dumps(analysis)
     except httpx.ConnectError as e:
         return f"Prometheus not available: {str(e)}"
 